@@ -0,0 +1,210 @@
+"""Solver benchmark suite.
+Times the solvers on the easy, medium, hard and adversarial corpora in
+sudoku/benchmarks, after an untimed warm-up run. Every puzzle is solved
+several times and its median time kept, then the median, 95th percentile
+and maximum over each corpus are reported as JSON, in milliseconds.
+
+When a baseline file is given, every statistic is compared against it
+and the exit status is 1 if any got slower by more than the threshold.
+
+Usage: python -m sudoku.bench --save baseline.json
+       python -m sudoku.bench --baseline baseline.json --threshold 20
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from sudoku.utils.sudoku_io import parse_board, read_lines
+from sudoku.utils.sudoku_solver import (
+    SudokuDLXSolver,
+    SudokuRandomSolver,
+    SudokuSolver,
+)
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "benchmarks")
+CORPORA = ["easy", "medium", "hard", "adversarial"]
+# functions creating a solver for a board, by name
+SOLVERS = {
+    "mrv": SudokuSolver,
+    "ordered": lambda board: SudokuSolver(board, search="ordered"),
+    "random": lambda board: SudokuRandomSolver(board, seed=0),
+    "dlx": SudokuDLXSolver,
+}
+STATS = ["median", "p95", "max"]
+
+
+def load_corpus(name, corpus_dir=CORPUS_DIR):
+    """Reads the boards of a corpus
+
+    Args:
+        name (str): corpus name, e.g. "hard"
+        corpus_dir (str): directory holding the corpus files
+
+    Returns:
+        list of 2D numpy arrays: boards of the corpus
+    """
+    with open(os.path.join(corpus_dir, f"{name}.txt")) as file:
+        return [parse_board(line) for line in read_lines(file)]
+
+
+def time_solve(solver, board, time_limit):
+    """Times one solve of a copy of board
+
+    Args:
+        solver (callable): creates a solver for a board
+        board (2D numpy array): board to solve
+        time_limit (float): seconds the solve may take
+
+    Returns:
+        (float, bool): seconds taken and whether the board was solved
+    """
+    board = board.copy()
+    # solvers report their outcome on stdout, which is kept for the JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        solved = solver(board).solve(time_limit=time_limit).solved
+        return time.perf_counter() - start, solved
+
+
+def run_corpus(solver, boards, repeat, time_limit):
+    """Benchmarks a solver on a corpus
+
+    Args:
+        solver (callable): creates a solver for a board
+        boards (list of 2D numpy arrays): boards of the corpus
+        repeat (int): timed solves of every board
+        time_limit (float): seconds every solve may take
+
+    Returns:
+        dict: median, p95 and max milliseconds per board, number of
+            boards and of boards left unsolved within the time limit
+    """
+    for board in boards:
+        time_solve(solver, board, time_limit)
+
+    times = []
+    failed = 0
+    for board in boards:
+        runs = [time_solve(solver, board, time_limit) for _ in range(repeat)]
+        times.append(np.median([seconds for seconds, _ in runs]) * 1000)
+        failed += not all(solved for _, solved in runs)
+
+    median, p95 = np.percentile(times, [50, 95])
+    return {
+        "median": float(median),
+        "p95": float(p95),
+        "max": float(max(times)),
+        "count": len(boards),
+        "failed": failed,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Finds the statistics that regressed against a baseline
+
+    Args:
+        results (dict): benchmark results by solver and corpus
+        baseline (dict): earlier results in the same format
+        threshold (float): percentage a statistic may grow by
+
+    Returns:
+        list of str: one description per regression
+    """
+    regressions = []
+    for solver, corpora in results.items():
+        for corpus, stats in corpora.items():
+            old = baseline.get(solver, {}).get(corpus)
+            if old is None:
+                continue
+            for stat in STATS:
+                limit = old[stat] * (1 + threshold / 100)
+                if stats[stat] > limit:
+                    regressions.append(
+                        f"{solver}/{corpus} {stat}: {stats[stat]:.3f} ms, "
+                        f"baseline {old[stat]:.3f} ms (+{threshold}% allowed)"
+                    )
+            if stats["failed"] > old["failed"]:
+                regressions.append(
+                    f"{solver}/{corpus} failed: {stats['failed']}, "
+                    f"baseline {old['failed']}"
+                )
+    return regressions
+
+
+def main(argv=None):
+    """Parses command line arguments and runs the benchmarks
+
+    Args:
+        argv (list of str): command line arguments, sys.argv if None
+
+    Returns:
+        int: exit status, 1 if a statistic regressed past the threshold
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sudoku.bench", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "-s",
+        "--solver",
+        action="append",
+        choices=sorted(SOLVERS),
+        help="solver to time, repeatable, mrv and dlx if omitted",
+    )
+    parser.add_argument(
+        "-c",
+        "--corpus",
+        action="append",
+        choices=CORPORA,
+        help="corpus to time, repeatable, all if omitted",
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=5, help="timed solves per board"
+    )
+    parser.add_argument(
+        "-t",
+        "--time-limit",
+        type=float,
+        default=10,
+        help="seconds a single solve may take",
+    )
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="percentage a statistic may regress by, default 10",
+    )
+    parser.add_argument("--save", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for solver in args.solver or ["mrv", "dlx"]:
+        results[solver] = {}
+        for corpus in args.corpus or CORPORA:
+            results[solver][corpus] = run_corpus(
+                SOLVERS[solver], load_corpus(corpus), args.repeat, args.time_limit
+            )
+
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Command line Sudoku board generator.
+Generates boards of a difficulty on a pool of worker processes and adds
+them to the boards the game picks from, saving each board as soon as it
+is done. Every board and every worker's grid factory draw from their own
+random streams, derived from one master seed. Passing the seed a run
+printed repeats it exactly with one worker; with more, the boards depend
+on which worker made which board.
+
+Usage: python -m sudoku.generate hard -n 1000 -j 8
+"""
+import argparse
+import os
+import sys
+
+from sudoku.utils.sudoku_generator import DIFFICULTY_CELLS, main as generate
+
+
+def main(argv=None):
+    """Parses command line arguments and generates the boards
+
+    Args:
+        argv (list of str): command line arguments, sys.argv if None
+
+    Returns:
+        int: exit status
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sudoku.generate", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("difficulty", choices=list(DIFFICULTY_CELLS))
+    parser.add_argument(
+        "-n", "--num", type=int, default=10, help="number of boards to generate"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="worker processes, 1 to generate in this process",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="master seed, printed when left random"
+    )
+    args = parser.parse_args(argv)
+
+    generate(args.num, args.difficulty, args.workers, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
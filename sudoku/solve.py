@@ -0,0 +1,116 @@
+"""Command line Sudoku solver.
+Reads puzzles in the one line per puzzle format, solves them on a pool
+of worker processes and writes the solutions in input order. Puzzles are
+streamed, so inputs of any size can be piped through it.
+
+Usage: python -m sudoku.solve puzzles.txt -o solutions.txt -j 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sudoku.utils.sudoku_stream import (
+    LatencyStats,
+    init_cache,
+    solve_stream,
+    solve_stream_parallel,
+)
+
+
+def report(stats, elapsed, out=sys.stderr):
+    """Prints throughput and latency percentiles
+
+    Args:
+        stats (LatencyStats): latencies of the solved puzzles
+        elapsed (float): total wall time in seconds
+        out (file object): where to print the report
+    """
+    rate = stats.count / elapsed if elapsed else 0.0
+    print(
+        f"solved {stats.count - stats.failed}/{stats.count} puzzles in "
+        f"{elapsed:.2f} s ({rate:.1f} puzzles/sec)",
+        file=out,
+    )
+    if stats.count:
+        p50, p90, p99 = stats.percentiles([50, 90, 99]) * 1000
+        print(
+            f"latency ms: p50 {p50:.3f} p90 {p90:.3f} p99 {p99:.3f} "
+            f"max {stats.max * 1000:.3f}",
+            file=out,
+        )
+
+
+def main(argv=None):
+    """Parses command line arguments and solves the puzzle file
+
+    Args:
+        argv (list of str): command line arguments, sys.argv if None
+
+    Returns:
+        int: exit status, 1 if some puzzles had no solution
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m sudoku.solve", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("input", help="puzzle file, - for stdin")
+    parser.add_argument("-o", "--output", help="solution file, stdout if omitted")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="worker processes, 1 to solve in this process",
+    )
+    parser.add_argument(
+        "-c", "--chunk-size", type=int, default=256, help="puzzles per task"
+    )
+    parser.add_argument(
+        "--cache",
+        type=int,
+        default=0,
+        help="solutions to cache per process by canonical form, 0 to disable",
+    )
+    args = parser.parse_args(argv)
+
+    infile = sys.stdin if args.input == "-" else open(args.input)
+    outfile = sys.stdout if args.output is None else open(args.output, "w")
+
+    stats = LatencyStats()
+    start = time.perf_counter()
+    try:
+        if args.workers == 1:
+            cache = init_cache(args.cache)
+            for line, solved, seconds in solve_stream(infile):
+                outfile.write(line + "\n")
+                stats.add(seconds, solved)
+            if cache is not None:
+                print(
+                    f"cache hits {cache.hits}/{cache.hits + cache.misses}",
+                    file=sys.stderr,
+                )
+        else:
+            with ProcessPoolExecutor(
+                max_workers=args.workers,
+                initializer=init_cache,
+                initargs=(args.cache,),
+            ) as executor:
+                results = solve_stream_parallel(
+                    infile, executor, args.workers, args.chunk_size
+                )
+                for line, solved, seconds in results:
+                    outfile.write(line + "\n")
+                    stats.add(seconds, solved)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
+    report(stats, time.perf_counter() - start)
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
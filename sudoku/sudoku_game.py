@@ -1,17 +1,16 @@
 """This module contains SudokuGame class.
 Starts the Sudoku game.
 """
-import multiprocessing
-import os
-import random
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pygame
 
-from sudoku import BOARD_LOC
-from sudoku.utils.sudoku_generator import main
+from sudoku.utils.sudoku_bank import open_bank
+from sudoku.utils.sudoku_generator import DIFFICULTY_CELLS
 from sudoku.utils.sudoku_gui import SudokuGui
+from sudoku.utils.sudoku_refill import RefillService, fallback_board
 
 # color definitions
 BLACK = (0, 0, 0)
@@ -58,29 +57,66 @@ class SudokuGame:
         self.running = True
         self.play_pressed = False
         self.generated_board = None
+        # keeps the banks of every difficulty stocked in the background
+        self.refill = RefillService().start()
+        # next board of every difficulty, loaded ahead on a background thread
+        self.loader = ThreadPoolExecutor(max_workers=1)
+        # bank of every difficulty, only used by the loader thread
+        self.banks = {}
+        self.prefetched = {}
+        for difficulty in DIFFICULTY_CELLS:
+            self.prefetch(difficulty)
         self.start_main()
 
-    def choose_board(self, difficulty):
-        """Choose a random board from generated boards
+    def prefetch(self, difficulty):
+        """Starts loading the next board of a difficulty in the background
+
+        Args:
+            difficulty (str): "easy", "medium", or "hard"
+        """
+        self.prefetched[difficulty] = self.loader.submit(self.load_board, difficulty)
+
+    def load_board(self, difficulty):
+        """Read the next board of the generated boards, leaving it in the
+        bank until it is chosen
+
+        Args:
+            difficulty (str): "easy", "medium", or "hard"
+
+        Returns:
+            (2D numpy array, bool): the board, 0 for empty cells, and
+                whether it is still in the bank
         """
+        if difficulty not in self.banks:
+            self.banks[difficulty] = open_bank(difficulty)
         try:
-            difficulty_dir = os.path.join(BOARD_LOC, difficulty)
-            board_list = os.listdir(difficulty_dir)
-            chosen = random.choice(board_list)
-            print(chosen)
-            self.generated_board = np.load(os.path.join(difficulty_dir, chosen))
-            os.remove(os.path.join(difficulty_dir, chosen))
-            if len(board_list) <= 1:
-                pro1 = multiprocessing.Process(target=main, args=[10, difficulty])
-                pro1.start()
-        except (FileNotFoundError, IndexError):
-            main(2, difficulty)
-            difficulty_dir = os.path.join(BOARD_LOC, difficulty)
-            board_list = os.listdir(difficulty_dir)
-            chosen = random.choice(board_list)
-            print(chosen)
-            self.generated_board = np.load(os.path.join(difficulty_dir, chosen))
-            os.remove(os.path.join(difficulty_dir, chosen))
+            return self.banks[difficulty].peek(), True
+        except IndexError:
+            # the refill service is behind, generating here would keep the
+            # board from being chosen until it is done
+            self.refill.notify()
+            return fallback_board(difficulty), False
+
+    def take_board(self, difficulty):
+        """Take the board read by load_board out of its bank
+
+        Args:
+            difficulty (str): "easy", "medium", or "hard"
+        """
+        self.banks[difficulty].take()
+        self.refill.notify()
+
+    def choose_board(self, difficulty):
+        """Take the board of a difficulty loaded ahead, and start loading
+        the next one
+        """
+        # only waits if the board is still loading, e.g. right at start
+        self.generated_board, in_bank = self.prefetched.pop(difficulty).result()
+        # the loader runs one task at a time, so the next board is read
+        # once this one is taken
+        if in_bank:
+            self.loader.submit(self.take_board, difficulty)
+        self.prefetch(difficulty)
 
     def select_button(self, pos):
         """Get selected button from mouse position and activate it
@@ -249,6 +285,8 @@ class SudokuGame:
                 # enable closing of display
                 if event.type == pygame.QUIT:
                     self.running = False
+                    self.refill.stop(timeout=1)
+                    self.loader.shutdown(wait=False)
                     pygame.quit()
                     sys.exit()
                 # getting position of mouse
@@ -0,0 +1,362 @@
+"""This module contains PuzzleBank class, a single packed file of
+pre-generated boards per difficulty, replacing one .npy file per board.
+
+A bank file is a HEADER_SIZE byte header followed by count boards of
+81 uint8 cells each, read row by row. The header holds the number of
+boards written and a cursor to the next unused board, so taking a board
+is O(1) and never lists a directory or deletes a file. Boards are read
+through a memory map of the file.
+
+Appends are crash safe: the boards are written past the end of the
+used part of the file and synced before the header's count is updated,
+so a crash leaves at most a torn tail that the header does not count
+and the next append cuts off. Header updates hold an exclusive lock on
+the file, taken with fcntl or on Windows with msvcrt, so the game and a
+refill process can share a bank.
+"""
+import errno
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from sudoku import BOARD_LOC
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, msvcrt is used there
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# False where bank files cannot be locked, banks must then not be shared
+# between processes
+LOCKING = fcntl is not None or msvcrt is not None
+# byte locked with msvcrt, far past the end of any bank, as Windows locks
+# keep other processes from reading the bytes they cover
+MSVCRT_LOCK_OFFSET = 2 ** 40
+
+MAGIC = b"SUDOKUBK"
+VERSION = 1
+# magic, version, cells per board, boards written, next board to take and
+# number of compactions, padded to HEADER_SIZE bytes
+HEADER = struct.Struct("<8sIIQQQ")
+HEADER_SIZE = 64
+# taken boards that make an append compact the bank first
+COMPACT_MIN = 4096
+# suffix of the .npy files being imported into a bank
+CLAIMED = ".importing"
+
+
+class PuzzleBank:
+    """Packed, memory mapped file of boards, taken in the order they
+    were added
+    """
+
+    def __init__(self, path, size=9):
+        self.path = str(path)
+        self.size = size
+        self.cells = size * size
+        if not os.path.exists(self.path):
+            self.create()
+        self.file = open(self.path, "r+b", buffering=0)
+        # memory map of the boards, remapped when boards are added or the
+        # bank is compacted
+        self.boards = None
+        self.generation = self.read_header()[2]
+
+    def pack_header(self, count, cursor, generation):
+        """Packs the fields of the header
+
+        Args:
+            count (int): boards written
+            cursor (int): next board to take
+            generation (int): number of compactions
+
+        Returns:
+            bytes: the header, HEADER_SIZE bytes long
+        """
+        header = HEADER.pack(MAGIC, VERSION, self.cells, count, cursor, generation)
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def create(self):
+        """Creates an empty bank file. The file is written aside and linked
+        into place, so other processes never see it without its header
+        """
+        temp = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as file:
+            file.write(self.pack_header(0, 0, 0))
+        try:
+            os.link(temp, self.path)
+        except FileExistsError:
+            # created by another process meanwhile
+            pass
+        finally:
+            os.remove(temp)
+
+    def read_header(self):
+        """Reads the header of the bank file
+
+        Raises:
+            ValueError: if the file is not a bank of boards of this size
+
+        Returns:
+            (int, int, int): boards written, next board to take and number
+                of compactions
+        """
+        self.file.seek(0)
+        data = self.file.read(HEADER.size)
+        if len(data) < HEADER.size:
+            raise ValueError(f"{self.path} is not a puzzle bank")
+        magic, version, cells, count, cursor, generation = HEADER.unpack(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a puzzle bank")
+        if cells != self.cells:
+            raise ValueError(f"{self.path} holds boards of {cells} cells")
+        return count, cursor, generation
+
+    def write_header(self, count, cursor, generation):
+        """Writes the header of the bank file
+
+        Args:
+            count (int): boards written
+            cursor (int): next board to take
+            generation (int): number of compactions
+        """
+        self.file.seek(0)
+        self.file.write(self.pack_header(count, cursor, generation))
+
+    @contextmanager
+    def locked(self):
+        """Holds an exclusive lock on the bank file, if files can be
+        locked here
+        """
+        fileno = self.file.fileno()
+        if fcntl is not None:
+            fcntl.flock(fileno, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            self.file.seek(MSVCRT_LOCK_OFFSET)
+            while True:
+                try:
+                    msvcrt.locking(fileno, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as error:
+                    # LK_LOCK gives up after 10 seconds of waiting
+                    if error.errno != errno.EDEADLOCK:
+                        raise
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fileno, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                self.file.seek(MSVCRT_LOCK_OFFSET)
+                msvcrt.locking(fileno, msvcrt.LK_UNLCK, 1)
+
+    def sync(self):
+        """Flushes the writes so far to disk
+        """
+        os.fsync(self.file.fileno())
+
+    def __len__(self):
+        with self.locked():
+            count, cursor, _ = self.read_header()
+        return count - cursor
+
+    def append(self, boards):
+        """Adds boards at the end of the bank
+
+        Args:
+            boards (list of 2D numpy arrays): boards to add, 0 for empty cells
+
+        Returns:
+            int: number of boards left in the bank
+        """
+        with self.locked():
+            return self.write_boards(boards)
+
+    def write_boards(self, boards):
+        """Adds boards at the end of the bank, run with the lock held
+
+        Args:
+            boards (list of 2D numpy arrays): boards to add, 0 for empty cells
+
+        Returns:
+            int: number of boards left in the bank
+        """
+        data = np.asarray(boards, dtype=np.uint8).reshape(-1, self.cells)
+        count, cursor, generation = self.read_header()
+        if cursor >= COMPACT_MIN and cursor * 2 >= count:
+            count, cursor, generation = self.compact(count, cursor, generation)
+        end = HEADER_SIZE + count * self.cells
+        # cuts off the tail of an append that crashed
+        self.file.truncate(end)
+        self.file.seek(end)
+        self.file.write(data.tobytes())
+        self.sync()
+        self.write_header(count + len(data), cursor, generation)
+        self.sync()
+        return count + len(data) - cursor
+
+    def compact(self, count, cursor, generation):
+        """Moves the boards not taken yet to the front of the bank, run
+        with the lock held
+
+        Args:
+            count (int): boards written
+            cursor (int): next board to take
+            generation (int): number of compactions
+
+        Returns:
+            (int, int, int): the new count, cursor and generation
+        """
+        self.boards = None
+        self.file.seek(HEADER_SIZE + cursor * self.cells)
+        data = self.file.read((count - cursor) * self.cells)
+        # mark the bank empty first, so a crash midway loses the boards
+        # left instead of serving some of them twice
+        self.write_header(0, 0, generation + 1)
+        self.sync()
+        self.file.seek(HEADER_SIZE)
+        self.file.write(data)
+        self.file.truncate(HEADER_SIZE + len(data))
+        self.sync()
+        count = len(data) // self.cells
+        self.write_header(count, 0, generation + 1)
+        self.sync()
+        return count, 0, generation + 1
+
+    def board_at(self, index, count, generation):
+        """Reads a board through the memory map, remapping the file if
+        boards were added or the bank was compacted. Run with the lock held
+
+        Args:
+            index (int): position of the board
+            count (int): boards written
+            generation (int): number of compactions
+
+        Returns:
+            2D numpy array: the board, 0 for empty cells
+        """
+        if (
+            self.boards is None
+            or generation != self.generation
+            or len(self.boards) < count
+        ):
+            self.boards = np.memmap(
+                self.file,
+                dtype=np.uint8,
+                mode="r",
+                offset=HEADER_SIZE,
+                shape=(count, self.cells),
+            )
+            self.generation = generation
+        return self.boards[index].astype(int).reshape(self.size, self.size)
+
+    def peek(self):
+        """Reads the next board without taking it out of the bank
+
+        Raises:
+            IndexError: if the bank is empty
+
+        Returns:
+            2D numpy array: the board, 0 for empty cells
+        """
+        with self.locked():
+            count, cursor, generation = self.read_header()
+            if cursor >= count:
+                raise IndexError("puzzle bank is empty")
+            return self.board_at(cursor, count, generation)
+
+    def take(self):
+        """Takes the next board out of the bank
+
+        Raises:
+            IndexError: if the bank is empty
+
+        Returns:
+            2D numpy array: the board, 0 for empty cells
+        """
+        with self.locked():
+            count, cursor, generation = self.read_header()
+            if cursor >= count:
+                raise IndexError("puzzle bank is empty")
+            board = self.board_at(cursor, count, generation)
+            self.write_header(count, cursor + 1, generation)
+        return board
+
+    def import_npy(self, directory):
+        """Moves the boards saved as one .npy file each in a directory
+        into the bank, deleting the files once the boards are added.
+        Every file is claimed by renaming it first, so that banks opened
+        at the same time import each board once
+
+        Args:
+            directory (str): directory of .npy boards
+
+        Returns:
+            int: number of boards imported
+        """
+        with self.locked():
+            for file in sorted(Path(directory).glob("*.npy")):
+                try:
+                    file.rename(file.with_name(file.name + CLAIMED))
+                except FileNotFoundError:
+                    # claimed by another process
+                    continue
+            # claimed files left by an import that crashed are taken too,
+            # the lock rules out an import still in progress
+            claimed = sorted(Path(directory).glob("*.npy" + CLAIMED))
+            if not claimed:
+                return 0
+            self.write_boards([np.load(file) for file in claimed])
+            for file in claimed:
+                file.unlink()
+        return len(claimed)
+
+    def close(self):
+        """Closes the bank file
+        """
+        self.boards = None
+        self.file.close()
+
+
+def bank_path(difficulty, board_loc=BOARD_LOC):
+    """Gets the path of the bank of a difficulty
+
+    Args:
+        difficulty (str): "easy", "medium", or "hard"
+        board_loc (str): directory of the banks
+
+    Returns:
+        str: path of the bank file
+    """
+    return os.path.join(board_loc, f"{difficulty}.bank")
+
+
+def open_bank(difficulty, board_loc=BOARD_LOC):
+    """Opens the bank of a difficulty, creating it if needed and moving
+    in the boards of the older one file per board layout
+
+    Args:
+        difficulty (str): "easy", "medium", or "hard"
+        board_loc (str): directory of the banks
+
+    Returns:
+        PuzzleBank: the bank
+    """
+    Path(board_loc).mkdir(parents=True, exist_ok=True)
+    bank = PuzzleBank(bank_path(difficulty, board_loc))
+    legacy_dir = os.path.join(board_loc, difficulty)
+    if os.path.isdir(legacy_dir):
+        bank.import_npy(legacy_dir)
+        try:
+            os.rmdir(legacy_dir)
+        except OSError:
+            # other files were kept there
+            pass
+    return bank
@@ -0,0 +1,114 @@
+"""This module contains solve_many, which solves a whole stack of
+Sudoku boards at once. Candidates of every board are held in one
+(N, 9, 9, 9) boolean array, so that naked and hidden singles are found
+for all boards with NumPy reductions. Boards that are still unsolved
+after propagation are handed to SudokuDLXSolver one at a time.
+"""
+import numpy as np
+
+from sudoku.utils.sudoku_solver import SudokuDLXSolver
+
+DIGITS = np.arange(1, 10)
+
+
+def unit_counts(onehot):
+    """Counts every digit in every row, column and box
+
+    Args:
+        onehot (4D numpy array): (N, 9, 9, 9) array, True where a cell
+            holds (or may hold) a digit
+
+    Returns:
+        tuple of numpy arrays: per row (N, 9, 9), per column (N, 9, 9)
+            and per box (N, 3, 3, 9) digit counts
+    """
+    num = onehot.shape[0]
+    # counts are at most 9, small integers keep the sums cheap
+    row_count = onehot.sum(axis=2, dtype=np.int8)
+    col_count = onehot.sum(axis=1, dtype=np.int8)
+    box_count = onehot.reshape(num, 3, 3, 3, 3, 9).sum(axis=(2, 4), dtype=np.int8)
+    return row_count, col_count, box_count
+
+
+def expand(row_val, col_val, box_val):
+    """Broadcasts per row, column and box values back to every cell
+
+    Args:
+        row_val (3D numpy array): (N, 9, 9) values per row and digit
+        col_val (3D numpy array): (N, 9, 9) values per column and digit
+        box_val (4D numpy array): (N, 3, 3, 9) values per box and digit
+
+    Returns:
+        tuple of numpy arrays: three (N, 9, 9, 9) arrays, one per unit
+    """
+    num = row_val.shape[0]
+    box_cells = np.broadcast_to(
+        box_val[:, :, None, :, None, :], (num, 3, 3, 3, 3, 9)
+    ).reshape(num, 9, 9, 9)
+    return row_val[:, :, None, :], col_val[:, None, :, :], box_cells
+
+
+def propagate(boards):
+    """Fills in naked and hidden singles of every board until no board
+    changes anymore
+
+    Args:
+        boards (3D numpy array): (N, 9, 9) boards, modified in place
+
+    Returns:
+        1D numpy array: True for boards found to have no solution
+    """
+    num = boards.shape[0]
+    dead = np.zeros(num, dtype=bool)
+    # boards that changed in the last sweep, only those are swept again
+    active = np.arange(num)
+
+    while len(active):
+        work = boards[active]
+        onehot = work[..., None] == DIGITS
+        row_used, col_used, box_used = expand(*unit_counts(onehot))
+        # boards holding a repeated number can never be solved
+        clash = ((row_used > 1) | (col_used > 1) | (box_used > 1)).any(axis=(1, 2, 3))
+
+        empty = work == 0
+        cand = empty[..., None] & (row_used == 0) & (col_used == 0) & (box_used == 0)
+        cand_count = cand.sum(axis=3, dtype=np.int8)
+        stuck = (empty & (cand_count == 0)).any(axis=(1, 2))
+        dead[active] |= clash | stuck
+
+        # a number is hidden single when only one cell of a unit can hold it
+        row_once, col_once, box_once = expand(*[c == 1 for c in unit_counts(cand)])
+        hidden = cand & (row_once | col_once | box_once)
+        naked = cand & (cand_count == 1)[..., None]
+        single = hidden | naked
+
+        found = single.any(axis=3) & ~dead[active, None, None]
+        work[found] = single[found].argmax(axis=1) + 1
+        boards[active] = work
+        active = active[found.any(axis=(1, 2))]
+
+    return dead
+
+
+def solve_many(boards):
+    """Solves a stack of Sudoku boards
+
+    Args:
+        boards (3D numpy array): (N, 9, 9) boards, 0 for empty cells
+
+    Returns:
+        3D numpy array: (N, 9, 9) solved boards. Boards without a
+            solution are returned unchanged
+    """
+    boards = np.asarray(boards)
+    solved = boards.astype(np.int8)
+    dead = propagate(solved)
+
+    for index in np.flatnonzero(dead | (solved == 0).any(axis=(1, 2))):
+        board = solved[index].astype(int)
+        if dead[index] or not SudokuDLXSolver(board).solve():
+            solved[index] = boards[index]
+        else:
+            solved[index] = board
+
+    return solved.astype(boards.dtype)
@@ -0,0 +1,185 @@
+"""This module contains CandidateGrid class.
+CandidateGrid keeps track of the numbers that can still be placed in
+each cell of a Sudoku board using integer masks, where bit num - 1 of
+a mask represents number num. Boards of any size from sudoku_tables
+are supported, a 25x25 board simply uses 25-bit masks.
+"""
+from sudoku.utils.sudoku_tables import get_tables
+
+
+def mask_to_nums(mask):
+    """Converts a mask into the numbers it contains
+
+    Args:
+        mask (int): mask of numbers
+
+    Returns:
+        list of int: numbers in mask, in increasing order
+    """
+    nums = []
+    while mask:
+        bit = mask & -mask
+        nums.append(bit.bit_length())
+        mask ^= bit
+    return nums
+
+
+class CandidateGrid:
+    """Candidate masks of a Sudoku board, kept up to date as numbers
+    are placed and removed
+    """
+
+    def __init__(self, board):
+        size = board.shape[0]
+        self.tables = get_tables(size)
+        self.size = size
+        self.full_mask = self.tables.full_mask
+        self.box_of = self.tables.box_of
+        self.bits = self.tables.bits
+        # occupancy masks of every row, column and box
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+        # numbers ruled out for a cell on top of what its units rule out
+        self.banned = [[0] * size for _ in range(size)]
+        # how many times each number appears in each unit, indexed like
+        # tables.units: rows, then columns, then boxes
+        self.counts = [[0] * (size + 1) for _ in range(3 * size)]
+        # how many surplus copies of numbers each unit holds
+        self.dups = [0] * (3 * size)
+
+        for i, row in enumerate(board.tolist()):
+            for j, num in enumerate(row):
+                if num != 0:
+                    self.place(i, j, num)
+
+    def place(self, row, col, num):
+        """Marks num as present in the units of specified cell
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+            num (int): number placed in cell
+        """
+        bit = self.bits[num]
+        box = self.box_of[row][col]
+        col_unit = self.size + col
+        box_unit = 2 * self.size + box
+        counts = self.counts
+        dups = self.dups
+
+        if counts[row][num]:
+            dups[row] += 1
+        else:
+            self.rows[row] |= bit
+        counts[row][num] += 1
+
+        if counts[col_unit][num]:
+            dups[col_unit] += 1
+        else:
+            self.cols[col] |= bit
+        counts[col_unit][num] += 1
+
+        if counts[box_unit][num]:
+            dups[box_unit] += 1
+        else:
+            self.boxes[box] |= bit
+        counts[box_unit][num] += 1
+
+    def remove(self, row, col, num):
+        """Marks num as absent from the units of specified cell
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+            num (int): number removed from cell
+        """
+        bit = ~self.bits[num]
+        box = self.box_of[row][col]
+        col_unit = self.size + col
+        box_unit = 2 * self.size + box
+        counts = self.counts
+        dups = self.dups
+
+        counts[row][num] -= 1
+        if counts[row][num]:
+            dups[row] -= 1
+        else:
+            self.rows[row] &= bit
+
+        counts[col_unit][num] -= 1
+        if counts[col_unit][num]:
+            dups[col_unit] -= 1
+        else:
+            self.cols[col] &= bit
+
+        counts[box_unit][num] -= 1
+        if counts[box_unit][num]:
+            dups[box_unit] -= 1
+        else:
+            self.boxes[box] &= bit
+
+    def legal(self, row, col):
+        """Checks whether the row, column and box of specified cell are
+        free of repeated numbers
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+
+        Returns:
+            bool: True if legal, False otherwise
+        """
+        dups = self.dups
+        size = self.size
+        return not (
+            dups[row] or dups[size + col] or dups[2 * size + self.box_of[row][col]]
+        )
+
+    def ban(self, row, col, num):
+        """Rules out num for specified cell
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+            num (int): number that cannot go in cell
+        """
+        self.banned[row][col] |= self.bits[num]
+
+    def eliminate(self, row, col, mask, trail=None):
+        """Rules out the numbers in mask for specified cell
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+            mask (int): mask of numbers that cannot go in cell
+            trail (list): if given, records (row, col, previous mask) so
+                that the elimination can be undone
+
+        Returns:
+            bool: True if any number was newly ruled out
+        """
+        old = self.banned[row][col]
+        if old | mask == old:
+            return False
+        if trail is not None:
+            trail.append((row, col, old))
+        self.banned[row][col] = old | mask
+        return True
+
+    def candidates(self, row, col):
+        """Gets the mask of numbers that can go in specified cell
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+
+        Returns:
+            int: mask of possible numbers
+        """
+        return self.full_mask & ~(
+            self.rows[row]
+            | self.cols[col]
+            | self.boxes[self.box_of[row][col]]
+            | self.banned[row][col]
+        )
@@ -0,0 +1,227 @@
+"""This module contains canonical_form and SolutionCache class.
+canonical_form maps a 9x9 board to a representative of its class under
+the Sudoku symmetry group: transposition, band and stack swaps, row
+swaps within bands, column swaps within stacks and relabeling of the
+numbers. Isomorphic boards share a canonical form, so solving one of
+them solves them all.
+
+The canonical form is the smallest board, read row by row, among the
+transforms whose givens pattern, read column by column, is the
+smallest. The givens pattern does not depend on the numbers, so the
+2 x 1296 row arrangements are ranked on it with NumPy first, and only
+the few that tie are relabeled and compared number by number.
+
+SolutionCache keeps the solutions of the most recently solved
+canonical forms and maps them back to every board of their class.
+"""
+from collections import OrderedDict
+from itertools import permutations, product
+
+import numpy as np
+
+from sudoku.utils.sudoku_solver import SudokuDLXSolver
+
+# the 1296 row orders that keep the bands of a board intact, one per row
+ROW_ORDERS = np.array(
+    [
+        [
+            band * 3 + within[index][i]
+            for index, band in enumerate(bands)
+            for i in range(3)
+        ]
+        for bands in permutations(range(3))
+        for within in product(permutations(range(3)), repeat=3)
+    ]
+)
+# ROW_WEIGHTS[order, row] is the weight of row in the givens pattern of
+# a column once the rows are put in that order, the first row weighing most.
+# Floats are exact here and let the product run on BLAS
+ROW_WEIGHTS = np.zeros((len(ROW_ORDERS), 9))
+np.put_along_axis(ROW_WEIGHTS, ROW_ORDERS, 1 << np.arange(8, -1, -1), axis=1)
+# weights packing the sorted column patterns of a stack into one key
+STACK_WEIGHTS = np.array([1 << 18, 1 << 9, 1])
+DIGITS = np.arange(1, 10)
+# transforms a board may tie on before canonical_form gives up
+MAX_TRANSFORMS = 20000
+
+
+def sort_triples(values):
+    """Sorts the last axis of an array of length 3, faster than np.sort
+
+    Args:
+        values (numpy array): array whose last axis has length 3
+
+    Returns:
+        numpy array: values sorted along the last axis
+    """
+    first, second, third = values[..., 0], values[..., 1], values[..., 2]
+    low = np.minimum(np.minimum(first, second), third)
+    high = np.maximum(np.maximum(first, second), third)
+    return np.stack([low, first + second + third - low - high, high], axis=-1)
+
+
+def ordered_choices(keys, items):
+    """Gets every order of items whose keys are non decreasing
+
+    Args:
+        keys (list of int): key of every item
+        items (list): items to order
+
+    Returns:
+        list of tuples: every order of items sorted by key
+    """
+    return [
+        order
+        for order in permutations(items)
+        if all(keys[a] <= keys[b] for a, b in zip(order, order[1:]))
+    ]
+
+
+def column_orders(keys):
+    """Gets the column orders that sort the givens pattern of a board
+
+    Args:
+        keys (1D numpy array): givens pattern of every column
+
+    Returns:
+        list of lists: column orders with the smallest pattern
+    """
+    keys = keys.tolist()
+    stacks = []
+    for stack in range(3):
+        cols = sorted(range(stack * 3, stack * 3 + 3), key=keys.__getitem__)
+        stack_key = [keys[col] for col in cols]
+        stacks.append((stack_key, ordered_choices(keys, cols)))
+    stack_keys = [stack_key for stack_key, _ in stacks]
+    orders = []
+    for stack_order in ordered_choices(stack_keys, range(3)):
+        for cols in product(*(stacks[stack][1] for stack in stack_order)):
+            orders.append([col for stack in cols for col in stack])
+    return orders
+
+
+def canonical_form(board):
+    """Finds the canonical form of a board and the transform leading to it
+
+    Args:
+        board (2D numpy array): 9x9 board, 0 for empty cells
+
+    Raises:
+        ValueError: if the board is not 9x9, or is so symmetric that
+            more than MAX_TRANSFORMS transforms tie, e.g. a full board
+
+    Returns:
+        (2D numpy array, tuple): canonical board and the transform
+            (transposed, row order, column order, number map) from board
+            to it, to be undone by from_canonical
+    """
+    board = np.asarray(board)
+    if board.shape != (9, 9):
+        raise ValueError(f"canonical forms need a 9x9 board, got {board.shape}")
+    views = np.stack([board, board.T])
+
+    # givens pattern of every column, for every view and row order
+    col_keys = (ROW_WEIGHTS @ (views != 0)).astype(np.int64).reshape(-1, 9)
+    stack_keys = sort_triples(sort_triples(col_keys.reshape(-1, 3, 3)) @ STACK_WEIGHTS)
+    # smallest stack keys in order, the first two packed into one int
+    head = stack_keys[:, 0] << 27 | stack_keys[:, 1]
+    tail = stack_keys[:, 2]
+    smallest = head == head.min()
+    ties = np.flatnonzero(smallest & (tail == tail[smallest].min()))
+
+    candidates = []
+    for tie in ties.tolist():
+        view, row_order = divmod(tie, len(ROW_ORDERS))
+        for col_order in column_orders(col_keys[tie]):
+            candidates.append((view, ROW_ORDERS[row_order], col_order))
+            if len(candidates) > MAX_TRANSFORMS:
+                raise ValueError("board too symmetric to canonicalize")
+
+    view_index = np.array([view for view, _, _ in candidates])
+    row_index = np.array([rows for _, rows, _ in candidates])
+    col_index = np.array([cols for _, _, cols in candidates])
+    flat = views[
+        view_index[:, None, None], row_index[:, :, None], col_index[:, None, :]
+    ].reshape(len(candidates), 81)
+
+    # relabel numbers in order of first appearance, absent ones last
+    present = flat[:, :, None] == DIGITS
+    first = np.where(present.any(axis=1), present.argmax(axis=1), 81)
+    labels = np.zeros((len(candidates), 10), dtype=board.dtype)
+    labels[:, 1:] = np.argsort(np.argsort(first, axis=1, kind="stable"), axis=1) + 1
+    relabeled = np.take_along_axis(labels, flat, axis=1)
+
+    index = np.lexsort(relabeled.T[::-1])[0]
+    view, rows, cols = candidates[index]
+    transform = (bool(view), np.asarray(rows), np.asarray(cols), labels[index])
+    return relabeled[index].reshape(9, 9), transform
+
+
+def from_canonical(board, transform):
+    """Maps a board in canonical coordinates back through a transform,
+    e.g. the solution of a canonical form to the solution of the board
+    the form came from
+
+    Args:
+        board (2D numpy array): board in canonical coordinates
+        transform (tuple): transform returned by canonical_form
+
+    Returns:
+        2D numpy array: the board in the original coordinates
+    """
+    transposed, rows, cols, labels = transform
+    unlabel = np.zeros_like(labels)
+    unlabel[labels] = np.arange(10)
+    original = np.zeros_like(board)
+    original[np.ix_(rows, cols)] = unlabel[board]
+    return original.T.copy() if transposed else original
+
+
+class SolutionCache:
+    """Least recently used cache of solutions, keyed by canonical form,
+    in front of a solver
+    """
+
+    def __init__(self, maxsize=4096, solver_class=SudokuDLXSolver):
+        self.maxsize = maxsize
+        # solver used on canonical forms missing from the cache
+        self.solver_class = solver_class
+        # canonical form bytes to its solution, None if it has none
+        self.solutions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, board):
+        """Solves a board in place, from the cache if an isomorphic board
+        was solved before. Boards without a canonical form are handed to
+        the solver directly
+
+        Args:
+            board (2D numpy array): board to solve, 0 for empty cells
+
+        Returns:
+            bool: True if the board was solved, False if it has no solution
+        """
+        try:
+            canonical, transform = canonical_form(board)
+        except ValueError:
+            return bool(self.solver_class(board).solve())
+
+        key = canonical.astype(np.uint8).tobytes()
+        if key in self.solutions:
+            self.hits += 1
+            self.solutions.move_to_end(key)
+            solution = self.solutions[key]
+        else:
+            self.misses += 1
+            solution = canonical.copy()
+            if not self.solver_class(solution).solve():
+                solution = None
+            self.solutions[key] = solution
+            if len(self.solutions) > self.maxsize:
+                self.solutions.popitem(last=False)
+
+        if solution is None:
+            return False
+        board[...] = from_canonical(solution, transform)
+        return True
@@ -1,44 +1,91 @@
 """This module contains Sudoku generator class, which creates
-randomized 2D 9x9 Sudoku boards.
+randomized 2D Sudoku boards, 9x9 by default or any n x n size with n a
+square number, e.g. 16x16 or 25x25. Full grids come from a GridFactory,
+which can be shared by many generators.
+
+generate_board keeps one GridFactory per process, so the solver made
+grids it mixes in keep adding variety to the boards of that process.
+With one worker a master seed reproduces a run exactly. With more, each
+worker's factory depends on the boards it happened to make, so the seed
+fixes every random stream but not which boards come out.
 """
-import os
+import multiprocessing
 import random
-from pathlib import Path
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
 
 import numpy as np
 
-from sudoku import BOARD_LOC
-from sudoku.utils.sudoku_solver import SudokuRandomSolver
+from sudoku.utils.sudoku_bank import open_bank
+from sudoku.utils.sudoku_grids import GridFactory
+from sudoku.utils.sudoku_profile import profiled
+from sudoku.utils.sudoku_solver import SudokuDLXSolver, count_solutions
+from sudoku.utils.sudoku_stats import BudgetExceeded
+from sudoku.utils.sudoku_tables import get_tables
 
+# cells left filled in per difficulty
+DIFFICULTY_CELLS = {"easy": 38, "medium": 30, "hard": 25}
+# share of the grids of generate_board solved from an empty board
+FRESH_RATE = 0.1
+# GridFactory shared by the boards generate_board makes in this process
+GRIDS = None
 
+
+@profiled("generator", "__init__", "remove_num")
 class SudokuGenerator:
     """Generates a Sudoku board
     """
 
-    NUM_RANGE = list(range(81))
-
-    def __init__(self, total_cells=30):
-        solver = SudokuRandomSolver(np.zeros((9, 9), dtype=int))
-        solver.solve()
-        print(solver.board)
-        self.board = solver.board.copy()
-        self.num_range = self.NUM_RANGE.copy()
+    # guesses a uniqueness check of a 9x9 board may make before the
+    # removal is given up, larger boards get fewer in proportion to their
+    # cells as every guess costs more
+    MAX_GUESSES = 20000
+
+    def __init__(
+        self,
+        total_cells=30,
+        solver_class=SudokuDLXSolver,
+        size=9,
+        seed=None,
+        grids=None,
+        verbose=True,
+    ):
+        # solver used to count the solutions of a board
+        self.solver_class = solver_class
+        # equal seeds generate equal boards, None seeds from the OS
+        self.rng = random.Random(seed)
+        self.size = size
+        self.max_guesses = self.MAX_GUESSES * 81 // (size * size)
+        # (row, col) of every flat cell index
+        self.cells = get_tables(size).cells
+        # GridFactory making the full grid, a new one seeded from self.rng
+        # if None
+        if grids is None:
+            grids = GridFactory(size, seed=self.rng.getrandbits(64))
+        self.board = grids.grid()
+        # verbose prints the full grid
+        if verbose:
+            print(self.board)
         self.remove_order = []
-        self.to_remove = 81 - total_cells
+        self.to_remove = size * size - total_cells
         self.generate_order()
         self.remove_num()
 
     def generate_order(self):
         """Generates the order of numbers to remove
         """
-        for _ in range(81):
-            num = random.choice(self.num_range)
-            self.num_range.remove(num)
-            self.remove_order.append((num // 9, num % 9))
+        order = list(range(self.size * self.size))
+        self.rng.shuffle(order)
+        self.remove_order = [self.cells[num] for num in order]
 
     def remove_num(self):
-        """Removes a number and checks whether board is still legal.
-        If not, restore number
+        """Removes a number and checks whether board still has a unique
+        solution. If not, restore number
         """
         index = 0
         for pos in self.remove_order:
@@ -49,45 +96,146 @@ class SudokuGenerator:
             num = self.board[row, col]
             self.board[row, col] = 0
 
-            test_solve = SudokuRandomSolver(self.board.copy(), row, col, num)
-            if test_solve.solve():
+            try:
+                solutions = count_solutions(
+                    self.board, 2, self.solver_class, max_guesses=self.max_guesses
+                )
+            except BudgetExceeded:
+                # too costly to check, keep the number
+                solutions = None
+
+            if solutions != 1:
                 self.board[row, col] = num
             else:
                 index += 1
 
 
-def main(num, difficulty):
-    """Generates num random boards with specified difficulty
+def derive_seeds(sequence, count):
+    """Derives seeds of independent random streams from a parent stream
 
     Args:
-        num (int): number of boards to generate
-        difficulty (str): "easy", "medium", or "hard"
+        sequence (numpy.random.SeedSequence): parent stream
+        count (int): number of seeds to derive
+
+    Returns:
+        list of int: one seed per stream
+    """
+    children = sequence.spawn(count)
+    return [int(child.generate_state(1, np.uint64)[0]) for child in children]
+
+
+def init_grids(seed=None):
+    """Sets up the GridFactory used by generate_board in this process
+
+    Args:
+        seed (int): seed of the factory, None to seed from the OS
+
+    Returns:
+        GridFactory: the factory
     """
-    Path(os.path.join(BOARD_LOC, "easy")).mkdir(parents=True, exist_ok=True)
-    Path(os.path.join(BOARD_LOC, "medium")).mkdir(parents=True, exist_ok=True)
-    Path(os.path.join(BOARD_LOC, "hard")).mkdir(parents=True, exist_ok=True)
+    global GRIDS
+    GRIDS = GridFactory(seed=seed, fresh_rate=FRESH_RATE)
+    return GRIDS
 
-    difficulty_dir = os.path.join(BOARD_LOC, difficulty)
-    board_list = os.listdir(difficulty_dir)
-    num_list = [int(f.split("_")[0]) for f in board_list]
 
-    difficulty_dict = {"easy": 38, "medium": 30, "hard": 25}
+def init_worker(grid_seeds):
+    """Sets up a worker process of generate_boards, run when it starts
+
+    Args:
+        grid_seeds (multiprocessing.SimpleQueue): one factory seed per
+            worker
+    """
+    init_grids(grid_seeds.get())
+
 
-    if num_list:
-        max_num = max(num_list)
-        max_num += 1
-    else:
-        max_num = 0
+def generate_board(total_cells, seed):
+    """Generates a single board, run by the worker processes
 
-    for i in range(num):
+    Args:
+        total_cells (int): number of cells left filled in
+        seed (int): seed of the board's random stream
+
+    Returns:
+        2D numpy array: the generated board
+    """
+    rng = random.Random(seed)
+    grids = GRIDS if GRIDS is not None else init_grids(rng.getrandbits(64))
+    # no full grid printed, the grids of parallel workers would
+    # interleave on stdout
+    generator = SudokuGenerator(
+        total_cells, seed=rng.getrandbits(64), grids=grids, verbose=False
+    )
+    return generator.board
+
+
+def generate_boards(num, total_cells, workers=1, seed=None):
+    """Generates boards on a pool of worker processes, keeping at most
+    two boards per worker in flight
+
+    Args:
+        num (int): number of boards to generate
+        total_cells (int): number of cells left filled in
+        workers (int): worker processes, 1 to generate in this process
+        seed (int): master seed, None to seed from the OS
+
+    Yields:
+        2D numpy array: generated boards, in order of completion
+    """
+    task_sequence, grid_sequence = np.random.SeedSequence(seed).spawn(2)
+    seeds = derive_seeds(task_sequence, num)
+    if workers == 1:
+        init_grids(derive_seeds(grid_sequence, 1)[0])
+        for board_seed in seeds:
+            yield generate_board(total_cells, board_seed)
+        return
+
+    grid_seeds = multiprocessing.SimpleQueue()
+    for grid_seed in derive_seeds(grid_sequence, workers):
+        grid_seeds.put(grid_seed)
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(grid_seeds,)
+    ) as executor:
+        pending = set()
+        for board_seed in seeds:
+            pending.add(executor.submit(generate_board, total_cells, board_seed))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
+
+
+def main(num, difficulty, workers=1, seed=None):
+    """Generates num random boards with specified difficulty, adding
+    every board to the difficulty's bank as soon as it is done
+
+    Args:
+        num (int): number of boards to generate
+        difficulty (str): "easy", "medium", or "hard"
+        workers (int): worker processes, 1 to generate in this process
+        seed (int): master seed, None to seed from the OS
+    """
+    bank = open_bank(difficulty)
+
+    # printed so that the run can be repeated, exactly with one worker
+    seed = np.random.SeedSequence(seed).entropy
+    print(f"seed {seed}")
+    start = time.perf_counter()
+    boards = generate_boards(num, DIFFICULTY_CELLS[difficulty], workers, seed)
+    for i, board in enumerate(boards):
         print(i)
-        generated_board = SudokuGenerator(difficulty_dict[difficulty])
-        print(generated_board.board)
+        print(board)
         print()
-        np.save(
-            os.path.join(difficulty_dir, f"{max_num + i}_board.npy"),
-            generated_board.board,
-        )
+        bank.append([board])
+    bank.close()
+
+    elapsed = time.perf_counter() - start
+    rate = num / elapsed if elapsed else 0.0
+    print(
+        f"generated {num} {difficulty} boards in {elapsed:.2f} s "
+        f"({rate:.2f} boards/sec, {workers} workers)"
+    )
 
 
 if __name__ == "__main__":
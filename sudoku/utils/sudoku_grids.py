@@ -0,0 +1,142 @@
+"""This module contains GridFactory class, which makes full Sudoku grids
+quickly by applying random symmetry transforms to a small pool of seed
+grids instead of solving an empty board every time.
+
+Every transform keeps a grid valid: relabeling the numbers, swapping
+rows within a band, columns within a stack, whole bands or stacks, and
+transposing. Each seed grid gives up to 2 x 6^8 x 9! different 9x9
+grids, but grids of one seed are all isomorphic to it, so the factory
+can also solve empty boards now and then and add the results to the
+pool for more variety.
+"""
+import random
+
+import numpy as np
+
+from sudoku.utils.sudoku_io import parse_board
+from sudoku.utils.sudoku_solver import SudokuRandomSolver
+from sudoku.utils.sudoku_tables import get_tables
+
+# solved 9x9 grids of different classes, read row by row
+SEED_GRIDS = [
+    "239751684568249173147368259981426735673195842452873916894512367716934528325687491",
+    "125794683637185429849236517768523941312479865594861372973618254481952736256347198",
+    "791623584584971362623458971267389415419567238835214796946135827158792643372846159",
+    "815372469764918235293564781672835914148297653359641827987156342421783596536429178",
+    "219653784853974162647218539564739218378421695921586473792865341436192857185347926",
+    "976853214351294786428671935835162479692487153147935862764519328283746591519328647",
+    "713865429652149837984372156438756912579213648261984375125638794897421563346597281",
+    "241965387693287541857143296975831624418726935362459178184592763526378419739614852",
+]
+
+
+def pattern_grid(size=9):
+    """Builds the solved grid whose rows are shifted copies of 1 to n,
+    a seed grid for any board size
+
+    Args:
+        size (int): number of rows of the grid, a square number
+
+    Returns:
+        2D numpy array: the grid
+    """
+    box_size = get_tables(size).box_size
+    rows = np.arange(size)
+    shifts = rows % box_size * box_size + rows // box_size
+    return (shifts[:, None] + rows) % size + 1
+
+
+class GridFactory:
+    """Makes random full grids from transforms of seed grids
+    """
+
+    def __init__(self, size=9, seed=None, seeds=None, fresh_rate=0.0, pool_size=32):
+        self.size = size
+        self.box_size = get_tables(size).box_size
+        # equal seeds give equal grids, None seeds from the OS
+        self.rng = random.Random(seed)
+        if seeds is None:
+            if size == 9:
+                seeds = [parse_board(line) for line in SEED_GRIDS]
+            else:
+                seeds = [pattern_grid(size)]
+        # grids the transforms are applied to
+        self.pool = [np.asarray(grid) for grid in seeds]
+        # share of the grids solved from an empty board and added to the pool
+        self.fresh_rate = fresh_rate
+        self.pool_size = pool_size
+
+    def solver_grid(self):
+        """Solves an empty board with random guesses
+
+        Returns:
+            2D numpy array: the solved grid
+        """
+        solver = SudokuRandomSolver(
+            np.zeros((self.size, self.size), dtype=int),
+            search="mrv",
+            seed=self.rng.getrandbits(64),
+        )
+        solver.solve()
+        return solver.board
+
+    def line_order(self):
+        """Draws a random order of the rows or columns of a grid that
+        keeps every band or stack together
+
+        Returns:
+            list of int: row or column index for every position
+        """
+        box_size = self.box_size
+        bands = list(range(box_size))
+        self.rng.shuffle(bands)
+        order = []
+        for band in bands:
+            lines = list(range(band * box_size, band * box_size + box_size))
+            self.rng.shuffle(lines)
+            order.extend(lines)
+        return order
+
+    def transform(self, grid):
+        """Applies a random symmetry transform to a grid
+
+        Args:
+            grid (2D numpy array): full grid to transform
+
+        Returns:
+            2D numpy array: new grid, valid if grid is
+        """
+        labels = list(range(1, self.size + 1))
+        self.rng.shuffle(labels)
+        labels = np.array([0] + labels)
+        if self.rng.random() < 0.5:
+            grid = grid.T
+        rows = self.line_order()
+        cols = self.line_order()
+        return labels[grid[np.ix_(rows, cols)]]
+
+    def grid(self):
+        """Makes the next grid
+
+        Returns:
+            2D numpy array: random full grid
+        """
+        if self.fresh_rate and self.rng.random() < self.fresh_rate:
+            grid = self.solver_grid()
+            if len(self.pool) < self.pool_size:
+                self.pool.append(grid)
+            else:
+                self.pool[self.rng.randrange(self.pool_size)] = grid
+            return grid.copy()
+        return self.transform(self.rng.choice(self.pool))
+
+    def grids(self, count):
+        """Makes several grids
+
+        Args:
+            count (int): number of grids to make
+
+        Returns:
+            list of 2D numpy arrays: random full grids
+        """
+        return [self.grid() for _ in range(count)]
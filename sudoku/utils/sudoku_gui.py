@@ -9,7 +9,10 @@ from collections import deque
 import numpy as np
 import pygame
 
-from sudoku.utils.sudoku_solver import SudokuSolver
+from sudoku.utils.sudoku_profile import profiled
+from sudoku.utils.sudoku_solver import SudokuDLXSolver
+from sudoku.utils.sudoku_tables import PEERS, TABLES, UNIT_INDEX
+from sudoku.utils.sudoku_worker import SolveWorker
 
 # color definitions
 BLACK = (0, 0, 0)
@@ -25,8 +28,36 @@ WIDTH = 540
 HEIGHT = 660
 
 FPS_FLAG = False
+# seconds the SPACE key solve may take before giving up
+SOLVE_TIME_LIMIT = 5
+# seconds of every frame given to solves run on the GUI thread
+SOLVE_SLICE = 0.008
 
 
+def units_legal(units):
+    """Checks whether units of a board are free of repeated numbers
+
+    Args:
+        units (2D numpy array): numbers of one unit per row, 0 for empty
+
+    Returns:
+        bool: True if no unit holds a number twice, False otherwise
+    """
+    units = np.sort(units, axis=1)
+    return not ((units[:, 1:] == units[:, :-1]) & (units[:, 1:] != 0)).any()
+
+
+@profiled(
+    "gui",
+    "collect_solve",
+    "update_gui",
+    "update_cells",
+    "draw_select_fill",
+    "draw_grid_lines",
+    "draw_numbers",
+    "draw_peripherals",
+    "flip_display",
+)
 class SudokuGui:
     """Class representing the GUI of a Sudoku board
     """
@@ -38,6 +69,9 @@ class SudokuGui:
 
     input_area = pygame.Rect(0, top_pad, width, width)
 
+    # solver used when solving the board instantly
+    solver_class = SudokuDLXSolver
+
     def __init__(self, board, fill_own=False):
         self.board = board.copy()
         self.board_backup = self.board.copy()
@@ -91,6 +125,8 @@ class SudokuGui:
         self.time_elapsed = 0
         self.clock = None
         self.solver = None
+        # SolveWorker of the SPACE key solve in progress, None if none
+        self.worker = None
         self.display = None
 
     def check_cell(self, row, col):
@@ -103,16 +139,9 @@ class SudokuGui:
         Returns:
             bool: whether updated cell value is legal, True if legal, False otherwise
         """
-        # checking row
-        row_bool = np.sum(self.board[row]) == sum(set(self.board[row]))
-        # checking col
-        col_bool = np.sum(self.board[:, col]) == sum(set(self.board[:, col]))
-        # checking box
-        r_beg = row // 3 * 3
-        c_beg = col // 3 * 3
-        box = self.board[r_beg : r_beg + 3, c_beg : c_beg + 3].flatten()
-        box_bool = np.sum(box) == sum(set(box))
-        return row_bool == col_bool == box_bool == True
+        # numbers of the row, column and box of the cell
+        units = self.board.take(UNIT_INDEX[TABLES.cell_units[row][col], :])
+        return units_legal(units)
 
     def check_board_validity(self):
         """Checks whether the entire board is valid
@@ -121,11 +150,7 @@ class SudokuGui:
             bool: True if board is valid, False otherwise
         """
         # final quality check of validity of solved board
-        for i in range(9):
-            for j in range(9):
-                if not self.check_cell(i, j):
-                    return False
-        return True
+        return units_legal(self.board.take(UNIT_INDEX))
 
     def clear_board(self):
         """Clears the sudoku board
@@ -258,19 +283,9 @@ class SudokuGui:
 
                 if not self.fill_own:
                     # clearing notes according to updated cell
-                    r_beg = self.selected_row // 3 * 3
-                    c_beg = self.selected_col // 3 * 3
-                    zipped = zip(
-                        self.cells_notes[self.selected_row],
-                        self.cells_notes[:, self.selected_col],
-                        self.cells_notes[
-                            r_beg : r_beg + 3, c_beg : c_beg + 3
-                        ].flatten(),
-                    )
-                    for row_cell, col_cell, box_cell in zipped:
-                        row_cell -= {num}
-                        col_cell -= {num}
-                        box_cell -= {num}
+                    self.cells_notes[self.selected_row, self.selected_col].discard(num)
+                    for i, j in PEERS[self.selected_row][self.selected_col]:
+                        self.cells_notes[i, j].discard(num)
 
         # updating notes
         elif self.mode:
@@ -290,6 +305,8 @@ class SudokuGui:
             # enable closing of display
             if event.type == pygame.QUIT:
                 self.running = False
+                if self.worker is not None:
+                    self.worker.cancel()
                 pygame.quit()
                 sys.exit()
             # getting position of mouse
@@ -299,6 +316,12 @@ class SudokuGui:
             # getting keyboard input
             if event.type == pygame.KEYDOWN:
                 keys = pygame.key.get_pressed()
+                # the board is left alone until the solve in progress ends,
+                # ESC cancels it
+                if self.worker is not None:
+                    if keys[pygame.K_ESCAPE]:
+                        self.worker.cancel()
+                    continue
                 if keys[pygame.K_n] and not self.fill_own:
                     self.mode = not self.mode
                 if keys[pygame.K_d]:
@@ -322,8 +345,10 @@ class SudokuGui:
                             self.selected_col,
                         )
                     )
-                    self.solver = SudokuSolver(self.board)
-                    self.solver.solve()
+                    self.worker = SolveWorker(
+                        self.board, self.solver_class, SOLVE_TIME_LIMIT
+                    ).start()
+                    self.solver = self.worker.solver
                 if keys[pygame.K_v] and not self.fill_own:
                     from sudoku.utils.sudoku_visual import SudokuVisualSolver
 
@@ -376,6 +401,17 @@ class SudokuGui:
             if num is not None and self.selected_cell is not None:
                 self.update_num_notes(num, delete)
 
+    def collect_solve(self):
+        """Puts the solution of the SPACE key solve on the board at once
+        when the solve has ended. Nothing changes if it was cancelled or
+        found no solution
+        """
+        if self.worker is None or not self.worker.done:
+            return
+        if self.worker.stats.solved:
+            self.board[...] = self.worker.board
+        self.worker = None
+
     def update_cells(self):
         """Updates the graphical representation of cells.
         Counts the number of correctly filled in cells
@@ -527,7 +563,13 @@ class SudokuGui:
             text = font.render("I", True, BLACK)
             self.display.blit(text, (50, 610))
 
-        if total == 81 and self.check_board_validity():
+        # progress of the SPACE key solve
+        if self.worker is not None:
+            text = font.render(
+                f"SOLVING {self.worker.guesses} {self.worker.elapsed:.1f}s", True, GREY,
+            )
+            self.display.blit(text, (self.width // 2 - text.get_width() // 2, 610))
+        elif total == 81 and self.check_board_validity():
             text = font.render("CONGRATS!", True, BLACK)
             self.display.blit(text, (self.width // 2 - text.get_width() // 2, 610))
 
@@ -544,6 +586,11 @@ class SudokuGui:
         self.draw_numbers()
         self.draw_peripherals(total)
 
+        self.flip_display()
+
+    def flip_display(self):
+        """Shows the frame drawn so far on screen
+        """
         pygame.display.update()
 
     def start_game(self):
@@ -560,6 +607,7 @@ class SudokuGui:
             self.time_elapsed = int((pygame.time.get_ticks() - start) / 1000)
 
             self.check_events()
+            self.collect_solve()
 
             self.clock.tick(60)
             self.update_gui()
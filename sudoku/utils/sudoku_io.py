@@ -0,0 +1,66 @@
+"""This module contains helpers to read and write Sudoku boards in the
+common one line per puzzle format, 81 characters read row by row with
+0 or . for empty cells.
+"""
+import numpy as np
+
+
+def parse_board(line):
+    """Converts an 81 character line into a board
+
+    Args:
+        line (str): puzzle, 0 or . for empty cells
+
+    Raises:
+        ValueError: if line does not hold exactly 81 cells
+
+    Returns:
+        2D numpy array: the board, 0 for empty cells
+    """
+    line = line.strip()
+    if len(line) != 81:
+        raise ValueError(f"expected 81 cells, got {len(line)}: {line!r}")
+    return np.array([0 if char == "." else int(char) for char in line]).reshape(9, 9)
+
+
+def format_board(board):
+    """Converts a board into an 81 character line
+
+    Args:
+        board (2D numpy array): the board, 0 for empty cells
+
+    Returns:
+        str: puzzle, 0 for empty cells
+    """
+    return "".join(str(num) for num in board.flatten().tolist())
+
+
+def read_numbered_lines(file):
+    """Reads the puzzle lines of a file with their line numbers, skipping
+    blank lines and lines starting with #
+
+    Args:
+        file (file object): file to read from
+
+    Yields:
+        (int, str): line number, starting at 1, and puzzle line without
+            surrounding whitespace
+    """
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield number, line
+
+
+def read_lines(file):
+    """Reads the puzzle lines of a file, skipping blank lines and
+    lines starting with #
+
+    Args:
+        file (file object): file to read from
+
+    Yields:
+        str: puzzle line without surrounding whitespace
+    """
+    for _, line in read_numbered_lines(file):
+        yield line
@@ -0,0 +1,203 @@
+"""This module contains opt-in profiling of the solvers, the generator
+and the GUI frame phases. Classes mark the methods worth profiling with
+the profiled decorator, which leaves them untouched until profiling is
+switched on, so it costs nothing when off.
+
+Profiling is switched on either by the SUDOKU_PROFILE environment
+variable or by calling enable:
+    SUDOKU_PROFILE=timers    count, total, mean and max time per method,
+                             written as JSON
+    SUDOKU_PROFILE=cprofile  cProfile statistics of everything run inside
+                             the methods, readable with pstats
+SUDOKU_PROFILE_OUT sets the file written on exit, by default
+sudoku_profile.json or sudoku_profile.prof in the working directory.
+An unknown SUDOKU_PROFILE value only warns and leaves profiling off.
+
+Timers cover every thread, e.g. solves run by a SolveWorker, while
+cProfile only follows the thread that switched profiling on.
+"""
+import atexit
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import warnings
+
+MODES = ("timers", "cprofile")
+DEFAULT_PATHS = {"timers": "sudoku_profile.json", "cprofile": "sudoku_profile.prof"}
+# (class, method name, report name) of every method that can be profiled
+TARGETS = []
+# profiler in use, None when profiling is off
+PROFILER = None
+
+
+class Profiler:
+    """Times the profiled methods while profiling is on
+    """
+
+    def __init__(self, mode="timers", path=None):
+        if mode not in MODES:
+            raise ValueError(f"profiling mode must be one of {MODES}, got {mode!r}")
+        self.mode = mode
+        self.path = path or DEFAULT_PATHS[mode]
+        # report name to [calls, total seconds, max seconds]
+        self.timers = {}
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        # cProfile only runs in this thread, the one profiling was enabled in
+        self.thread = threading.get_ident()
+        # profiled calls in progress per thread, cProfile only runs for the
+        # outermost
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        # (class, method name, original function) of the wrapped methods
+        self.originals = []
+
+    def wrap(self, owner, attribute, name):
+        """Replaces a method by a timed version of it
+
+        Args:
+            owner (class): class defining the method
+            attribute (str): name of the method
+            name (str): name of the method in the report
+        """
+        func = owner.__dict__[attribute]
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            depth = getattr(self.local, "depth", 0)
+            outermost = (
+                self.profile is not None
+                and not depth
+                and threading.get_ident() == self.thread
+            )
+            if outermost:
+                self.profile.enable()
+            self.local.depth = depth + 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.local.depth = depth
+                if outermost:
+                    self.profile.disable()
+                self.record(name, time.perf_counter() - start)
+
+        setattr(owner, attribute, timed)
+        self.originals.append((owner, attribute, func))
+
+    def unwrap(self):
+        """Puts back the original methods
+        """
+        for owner, attribute, func in reversed(self.originals):
+            setattr(owner, attribute, func)
+        self.originals.clear()
+
+    def record(self, name, seconds):
+        """Adds one call to the timer of a method
+
+        Args:
+            name (str): name of the method in the report
+            seconds (float): time the call took
+        """
+        with self.lock:
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def report(self):
+        """Summarizes the timers, slowest total first
+
+        Returns:
+            dict: calls, total, mean and max seconds by method
+        """
+        timers = sorted(self.timers.items(), key=lambda item: -item[1][1])
+        return {
+            name: {"calls": calls, "total": total, "mean": total / calls, "max": top}
+            for name, (calls, total, top) in timers
+        }
+
+    def write(self):
+        """Writes the results to self.path
+        """
+        if self.profile is not None:
+            self.profile.dump_stats(self.path)
+        else:
+            with open(self.path, "w") as file:
+                json.dump(self.report(), file, indent=2)
+
+
+def profiled(prefix, *attributes):
+    """Class decorator marking methods to profile, reported as
+    prefix.method
+
+    Args:
+        prefix (str): name of the class in the report
+        *attributes (str): names of the methods to profile
+
+    Returns:
+        function: the decorator, returning the class itself
+    """
+
+    def decorate(cls):
+        for attribute in attributes:
+            target = (cls, attribute, f"{prefix}.{attribute}")
+            TARGETS.append(target)
+            if PROFILER is not None:
+                PROFILER.wrap(*target)
+        return cls
+
+    return decorate
+
+
+def enable(mode="timers", path=None):
+    """Switches profiling on, results are written when the program exits
+    or by disable
+
+    Args:
+        mode (str): "timers" or "cprofile"
+        path (str): file to write the results to, None for the default
+
+    Raises:
+        ValueError: if mode is unknown
+
+    Returns:
+        Profiler: the profiler now in use
+    """
+    global PROFILER
+    profiler = Profiler(mode, path)
+    disable(write=False)
+    PROFILER = profiler
+    for target in TARGETS:
+        PROFILER.wrap(*target)
+    return PROFILER
+
+
+def disable(write=True):
+    """Switches profiling off
+
+    Args:
+        write (bool): whether to write the results first
+
+    Returns:
+        Profiler: the profiler that was in use, None if profiling was off
+    """
+    global PROFILER
+    profiler = PROFILER
+    PROFILER = None
+    if profiler is not None:
+        profiler.unwrap()
+        if write:
+            profiler.write()
+    return profiler
+
+
+atexit.register(disable)
+
+if os.environ.get("SUDOKU_PROFILE"):
+    try:
+        enable(os.environ["SUDOKU_PROFILE"], os.environ.get("SUDOKU_PROFILE_OUT"))
+    except ValueError as error:
+        warnings.warn(f"SUDOKU_PROFILE ignored, {error}")
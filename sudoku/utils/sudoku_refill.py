@@ -0,0 +1,155 @@
+"""This module contains RefillService class, which keeps the puzzle
+banks of every difficulty stocked from a single long lived background
+process.
+
+Every difficulty has a low and a high watermark. Once a bank drops below
+its low watermark the service generates boards for it until it reaches
+the high one, one board at a time and always for the bank with the
+fewest boards left, so every board is available as soon as it is made.
+Being a single process, the service never runs two refills at once, and
+the game only ever sends it notifications, which never block. Should a
+bank run dry anyway, fallback_board gives the game a board at once.
+"""
+import multiprocessing
+import os
+import queue
+import warnings
+
+import numpy as np
+
+from sudoku import BOARD_LOC
+from sudoku.utils.sudoku_bank import LOCKING, open_bank
+from sudoku.utils.sudoku_generator import DIFFICULTY_CELLS, generate_board
+from sudoku.utils.sudoku_grids import GridFactory
+from sudoku.utils.sudoku_io import parse_board, read_lines
+
+# (low, high) number of boards left by difficulty
+WATERMARKS = {"easy": (5, 20), "medium": (5, 20), "hard": (5, 20)}
+# seconds between two checks of the banks when nothing is asked
+POLL_INTERVAL = 5.0
+# boards of every difficulty shipped for fallback_board, separate from the
+# benchmark corpora so that editing those never changes the game
+FALLBACK_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "boards_fallback"
+)
+
+
+def fallback_board(difficulty, fallback_dir=FALLBACK_DIR):
+    """Makes a board without generating one, for when a bank is empty.
+    A shipped board of the difficulty is put through a random symmetry
+    transform, which keeps its number of clues and its unique solution
+
+    Args:
+        difficulty (str): "easy", "medium", or "hard"
+        fallback_dir (str): directory of the shipped boards
+
+    Returns:
+        2D numpy array: the board, 0 for empty cells
+    """
+    with open(os.path.join(fallback_dir, f"{difficulty}.txt")) as file:
+        boards = [parse_board(line) for line in read_lines(file)]
+    factory = GridFactory()
+    return factory.transform(factory.rng.choice(boards))
+
+
+def run_refill(requests, watermarks, board_loc, poll_interval):
+    """Main loop of the refill process, stops when None is received
+
+    Args:
+        requests (multiprocessing.Queue): notifications from the game,
+            any value but None makes the banks get checked at once
+        watermarks (dict): (low, high) boards left by difficulty
+        board_loc (str): directory of the banks
+        poll_interval (float): seconds between two checks when idle
+    """
+    banks = {difficulty: open_bank(difficulty, board_loc) for difficulty in watermarks}
+    # every board draws from its own random stream
+    seeds = np.random.SeedSequence()
+    # difficulties refilling until they reach their high watermark
+    filling = set()
+    while True:
+        left = {difficulty: len(bank) for difficulty, bank in banks.items()}
+        for difficulty, (low, high) in watermarks.items():
+            if left[difficulty] < low:
+                filling.add(difficulty)
+            elif left[difficulty] >= high:
+                filling.discard(difficulty)
+
+        if filling:
+            difficulty = min(filling, key=left.get)
+            seed = int(seeds.spawn(1)[0].generate_state(1, np.uint64)[0])
+            board = generate_board(DIFFICULTY_CELLS[difficulty], seed)
+            banks[difficulty].append([board])
+
+        try:
+            if filling:
+                request = requests.get_nowait()
+            else:
+                request = requests.get(timeout=poll_interval)
+        except queue.Empty:
+            continue
+        if request is None:
+            break
+
+    for bank in banks.values():
+        bank.close()
+
+
+class RefillService:
+    """Refills the puzzle banks in a background process
+    """
+
+    def __init__(
+        self, watermarks=None, board_loc=BOARD_LOC, poll_interval=POLL_INTERVAL
+    ):
+        self.watermarks = dict(WATERMARKS if watermarks is None else watermarks)
+        self.board_loc = board_loc
+        self.poll_interval = poll_interval
+        self.requests = multiprocessing.Queue()
+        self.process = None
+
+    @property
+    def running(self):
+        """bool: True while the refill process is alive
+        """
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """Starts the refill process, unless it is already running or the
+        banks cannot be locked here, as the process shares them with the
+        game
+
+        Returns:
+            RefillService: the service itself
+        """
+        if not LOCKING:
+            warnings.warn("puzzle banks cannot be locked, boards are not refilled")
+        elif not self.running:
+            self.process = multiprocessing.Process(
+                target=run_refill,
+                args=(
+                    self.requests,
+                    self.watermarks,
+                    self.board_loc,
+                    self.poll_interval,
+                ),
+                daemon=True,
+            )
+            self.process.start()
+        return self
+
+    def notify(self):
+        """Makes the service check the banks now, e.g. after a board was
+        taken. Never blocks
+        """
+        self.requests.put_nowait(True)
+
+    def stop(self, timeout=None):
+        """Stops the refill process once the board in progress is added
+
+        Args:
+            timeout (float): seconds to wait for it, None to wait until done
+        """
+        if self.running:
+            self.requests.put_nowait(None)
+            self.process.join(timeout)
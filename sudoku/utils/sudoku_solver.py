@@ -1,32 +1,137 @@
 """This module creates SudokuSolver and SudokuRandomSolver classes.
-SudokuSolver solves a board using backtracking algorithm, guessing
-from 1 to 9 for each cell until the board is solved.
+SudokuSolver solves a board using backtracking algorithm. By default it
+guesses the most constrained cell first and fills in forced cells after
+every guess, it can also guess from 1 to n for each cell in row order
+until the board is solved. Boards of any size n x n with n a square
+number are supported, e.g. 9x9, 16x16 or 25x25.
 
 SudokuRandomSolver solves a board using backtracking algorithm, but
 guesses randomly for each cell until the board is solved. This solver
 is mainly used to generate new boards.
+
+SudokuDLXSolver solves a board as an exact cover problem, using
+Knuth's Algorithm X with Dancing Links.
+
+SudokuSolver and SudokuRandomSolver can also solve step by step with
+solve_steps, a generator pausing every few guesses, so that an event
+loop can run the solve a time slice at a time.
 """
-import datetime
 import random
+import time
 
 import numpy as np
 
+from sudoku.utils.sudoku_candidates import CandidateGrid, mask_to_nums
+from sudoku.utils.sudoku_profile import profiled
+from sudoku.utils.sudoku_stats import (
+    BUDGET_EXCEEDED,
+    NO_SOLUTION,
+    SOLVED,
+    Budget,
+    BudgetExceeded,
+    SolveStats,
+)
+from sudoku.utils.sudoku_tables import bit_count, get_tables
+from sudoku.utils.sudoku_techniques import TECHNIQUES
+
+# guesses between two yields of the step generators, e.g. solve_steps
+STEP_SIZE = 16
+
+
+def run_steps(steps):
+    """Runs a step generator, e.g. solve_steps, to its end
+
+    Args:
+        steps (generator): generator to run
+
+    Returns:
+        the value returned by the generator
+    """
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        return stop.value
+
+
+def run_slice(steps, seconds):
+    """Runs a step generator for about a time slice, stopping at the
+    first yield after it is used up
 
+    Args:
+        steps (generator): generator to run
+        seconds (float): length of the time slice
+
+    Returns:
+        (bool, object): whether the generator ended, and the value it
+            returned, None if it has not ended
+    """
+    deadline = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < deadline:
+            next(steps)
+    except StopIteration as stop:
+        return True, stop.value
+    return False, None
+
+
+@profiled("solver", "solve", "count_solutions")
 class SudokuSolver:
     """Given a Sudoku board, solves it using altered backtracking algorithm
     """
 
-    NUM_SET = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-    NUM_LIST = [1, 2, 3, 4, 5, 6, 7, 8, 9]
-
-    def __init__(self, board):
+    def __init__(self, board, search="mrv", techniques=(), stats=True):
         self.board = board
-        self.possible = np.empty((9, 9), dtype=set)
+        self.grid = CandidateGrid(board)
+        # board size and index tables, taken from the board's shape
+        self.size = self.grid.size
+        self.tables = self.grid.tables
+        # "mrv" for most constrained cell first, "ordered" for row order
+        self.search = search
+        # names of the TECHNIQUES applied after singles run out
+        self.techniques = [(name, TECHNIQUES[name]) for name in techniques]
+        # counters are only updated when stats is True, timings always are
+        self.collect_stats = stats
+        self.stats = SolveStats()
+        self.stats.techniques = dict.fromkeys(techniques, 0)
+        # no limits until solve or count_solutions is given some
+        self.budget = Budget()
+        self.empty = set()
         self.zeros = []
         self.zero_index = 0
         self.last_time = 0
         self.same = False
 
+    def place(self, row, col, num):
+        """Fills in specified cell with num
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+            num (int): number to fill in
+        """
+        self.board[row, col] = num
+        self.grid.place(row, col, num)
+
+    def unplace(self, row, col):
+        """Empties specified cell
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+        """
+        self.grid.remove(row, col, self.board[row, col])
+        self.board[row, col] = 0
+
+    def record_fill(self, rule):
+        """Counts a cell filled in by rule, if stats are collected
+
+        Args:
+            rule (str): "naked_single" or "hidden_single"
+        """
+        if self.collect_stats:
+            self.stats.filled[rule] += 1
+
     def check_self(self, row, col):
         """If specified cell only has one possible number, fill it in
 
@@ -34,9 +139,10 @@ class SudokuSolver:
             row (int): row of specified cell
             col (int): col of specified cell
         """
-        pos = self.possible[row, col].copy()
-        if len(pos) == 1:
-            self.board[row, col] = pos.pop()
+        pos = self.get_possible(row, col)
+        if pos and not pos & (pos - 1):
+            self.place(row, col, pos.bit_length())
+            self.record_fill("naked_single")
 
     def fill_row(self, row, col):
         """If specified cell has unique number that no other cells in
@@ -46,14 +152,15 @@ class SudokuSolver:
             row (int): row of specified cell
             col (int): col of specified cell
         """
-        pos = self.possible[row, col].copy()
-        for index, cell in enumerate(self.possible[row]):
+        pos = self.get_possible(row, col)
+        for index in range(self.size):
             if index != col:
-                pos -= cell
+                pos &= ~self.get_possible(row, index)
             if not pos:
                 break
         else:
-            self.board[row, col] = pos.pop()
+            self.place(row, col, (pos & -pos).bit_length())
+            self.record_fill("hidden_single")
 
     def fill_col(self, row, col):
         """If specified cell has unique number that no other cells in
@@ -63,14 +170,15 @@ class SudokuSolver:
             row (int): row of specified cell
             col (int): col of specified cell
         """
-        pos = self.possible[row, col].copy()
-        for index, cell in enumerate(self.possible[:, col]):
+        pos = self.get_possible(row, col)
+        for index in range(self.size):
             if index != row:
-                pos -= cell
+                pos &= ~self.get_possible(index, col)
             if not pos:
                 break
         else:
-            self.board[row, col] = pos.pop()
+            self.place(row, col, (pos & -pos).bit_length())
+            self.record_fill("hidden_single")
 
     def fill_box(self, row, col):
         """If specified cell has unique number that no other cells in
@@ -80,17 +188,16 @@ class SudokuSolver:
             row (int): row of specified cell
             col (int): col of specified cell
         """
-        r_beg = row // 3 * 3
-        c_beg = col // 3 * 3
-        pos = self.possible[row, col].copy()
-        flattened = self.possible[r_beg : r_beg + 3, c_beg : c_beg + 3].flatten()
-        for index, cell in enumerate(flattened):
-            if index != (row % 3) * 3 + (col % 3):
-                pos -= cell
+        box = self.tables.box_of[row][col]
+        pos = self.get_possible(row, col)
+        for i, j in self.tables.units[2 * self.size + box]:
+            if i != row or j != col:
+                pos &= ~self.get_possible(i, j)
             if not pos:
                 break
         else:
-            self.board[row, col] = pos.pop()
+            self.place(row, col, (pos & -pos).bit_length())
+            self.record_fill("hidden_single")
 
     def get_possible(self, row, col):
         """Get possible nums for specified cell
@@ -100,44 +207,63 @@ class SudokuSolver:
             col (int): col of specified cell
 
         Returns:
-            set: set containing possible numbers
-        """
-        row_set = self.NUM_SET - set(self.board[row])
-        col_set = self.NUM_SET - set(self.board[:, col])
-        r_beg = row // 3 * 3
-        c_beg = col // 3 * 3
-        box_set = self.NUM_SET - set(
-            self.board[r_beg : r_beg + 3, c_beg : c_beg + 3].flatten()
-        )
-
-        return row_set.intersection(col_set, box_set)
+            int: mask of possible numbers, 0 if the cell is already filled
+        """
+        if self.board[row, col] != 0:
+            return 0
+        return self.grid.candidates(row, col)
 
     def get_zeros(self):
-        """Gets all positions of 0s in the board
+        """Counts the 0s in the board and checks whether every empty cell
+        and every row, column and box can still be completed
+
+        Returns:
+            bool: False if the board has reached a dead end, True otherwise
         """
         counter = 0
+        alive = True
+        size = self.size
+        box_of = self.tables.box_of
+        full_mask = self.tables.full_mask
+        row_pos = [0] * size
+        col_pos = [0] * size
+        box_pos = [0] * size
 
-        for i, row in enumerate(self.board):
+        for i, row in enumerate(self.board.tolist()):
             for j, cell in enumerate(row):
                 if cell == 0:
-                    self.possible[i, j] = self.get_possible(i, j)
+                    pos = self.grid.candidates(i, j)
+                    if not pos:
+                        alive = False
+                    row_pos[i] |= pos
+                    col_pos[j] |= pos
+                    box_pos[box_of[i][j]] |= pos
                     counter += 1
-                else:
-                    self.possible[i, j] = set()
+
+        grid = self.grid
+        for i in range(size):
+            if (
+                row_pos[i] | grid.rows[i] != full_mask
+                or col_pos[i] | grid.cols[i] != full_mask
+                or box_pos[i] | grid.boxes[i] != full_mask
+            ):
+                alive = False
 
         self.same = self.last_time == counter
 
         self.last_time = counter
+        return alive
 
     def preprocess(self):
         """Fills in some cells of the Sudoku board that can be filled in
         """
         while not self.same:
-            self.possible = np.empty((9, 9), dtype=set)
             self.get_zeros()
+            if self.collect_stats:
+                self.stats.preprocess_passes += 1
 
-            for i in range(9):
-                for j in range(9):
+            for i in range(self.size):
+                for j in range(self.size):
                     self.check_self(i, j)
                     self.fill_row(i, j)
                     self.fill_col(i, j)
@@ -151,11 +277,13 @@ class SudokuSolver:
             col (int): column of the cell to guess
         """
         cur_val = self.board[row, col]
-        for num in range(cur_val + 1, 10):
-            self.board[row, col] = num
+        if cur_val != 0:
+            self.unplace(row, col)
+        for num in range(cur_val + 1, self.size + 1):
+            self.place(row, col, num)
             if self.check_cell(row, col):
                 return True
-        self.board[row, col] = 0
+            self.unplace(row, col)
         return False
 
     def check_cell(self, row, col):
@@ -168,150 +296,465 @@ class SudokuSolver:
         Returns:
             bool: whether updated cell value is legal, True if legal, False otherwise
         """
-        # checking row
-        row_bool = np.sum(self.board[row]) == sum(set(self.board[row]))
-        # checking col
-        col_bool = np.sum(self.board[:, col]) == sum(set(self.board[:, col]))
-        # checking box
-        r_beg = row // 3 * 3
-        c_beg = col // 3 * 3
-        box = self.board[r_beg : r_beg + 3, c_beg : c_beg + 3].flatten()
-        box_bool = np.sum(box) == sum(set(box))
-        return row_bool == col_bool == box_bool == True
-
-    def solve(self):
-        """Solves the Sudoku board with backtracking
-        """
-        self.preprocess()
+        return self.grid.legal(row, col)
+
+    def search_ordered_steps(self, step_size=STEP_SIZE):
+        """Guesses the empty cells in row order, from 1 to n, pausing
+        every step_size guesses
+
+        Args:
+            step_size (int): guesses between two yields
+
+        Raises:
+            BudgetExceeded: if the budget runs out before the search ends
+
+        Yields:
+            int: guesses made so far, after every step_size guesses
 
+        Returns:
+            bool: True if the board is solved, False if it has no solution
+        """
         for i, row in enumerate(self.board):
             for j, cell in enumerate(row):
                 if cell == 0:
                     self.zeros.append((i, j))
 
+        stats = self.stats if self.collect_stats else None
         while self.zero_index < len(self.zeros):
             pos = self.zeros[self.zero_index]
             if self.zero_index < 0:
-                print("NO SOLUTION")
                 return False
+            self.budget.spend()
             if self.guess_cell(pos[0], pos[1]):
                 self.zero_index += 1
+                if stats is not None:
+                    stats.max_depth = max(stats.max_depth, self.zero_index)
             else:
                 self.zero_index -= 1
+                if stats is not None:
+                    stats.backtracks += 1
+            if self.budget.guesses % step_size == 0:
+                yield self.budget.guesses
 
-        print("VALID")
+        return True
 
+    def assign(self, row, col, num, trail):
+        """Fills in specified cell during search, recording it in trail
 
-class SudokuRandomSolver(SudokuSolver):
-    """Given a Sudoku board, solves it using backtracking algorithm
-    """
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+            num (int): number to fill in
+            trail (list): cells filled in so far
+        """
+        self.place(row, col, num)
+        self.empty.discard((row, col))
+        trail.append((row, col))
 
-    def __init__(self, board, row=None, col=None, num=None):
-        super().__init__(board)
-        self.time_now = datetime.datetime.now().timestamp()
-        # optional exclusion num
-        self.row = row
-        self.col = col
-        self.num = num
+    def undo(self, trail, mark):
+        """Undoes the cells filled in and the numbers ruled out since
+        trail had length mark
 
-    def check_self(self, row, col):
-        """If specified cell only has one possible number, fill it in
+        Args:
+            trail (list): cells filled in and numbers ruled out so far
+            mark (int): length of trail to go back to
+        """
+        while len(trail) > mark:
+            step = trail.pop()
+            if len(step) == 3:
+                self.grid.banned[step[0]][step[1]] = step[2]
+            else:
+                self.unplace(*step)
+                self.empty.add(step)
+
+    def propagate(self, trail):
+        """Fills in cells that only have one possible number and numbers
+        that only fit in one cell of a unit, then applies the enabled
+        techniques, until none of them make progress
 
         Args:
-            row (int): row of specified cell
-            col (int): col of specified cell
+            trail (list): cells filled in and numbers ruled out so far
+
+        Returns:
+            bool: False if the board has reached a dead end, True otherwise
         """
-        pos = self.possible[row, col].copy()
-        if len(pos) == 1:
-            num = pos.pop()
-            if self.row == row and self.col == col and self.num == num:
+        while True:
+            if not self.fill_singles(trail):
                 return False
-            self.board[row, col] = num
-        return True
+            for name, technique in self.techniques:
+                if technique(self.grid, self.empty, trail):
+                    if self.collect_stats:
+                        self.stats.techniques[name] += 1
+                    break
+            else:
+                return True
 
-    def fill_row(self, row, col):
-        """If specified cell has unique number that no other cells in
-        this row have, then fill it in
+    def fill_singles(self, trail):
+        """Fills in cells that only have one possible number and numbers
+        that only fit in one cell of a unit, until none are left
 
         Args:
-            row (int): row of specified cell
-            col (int): col of specified cell
+            trail (list): cells filled in and numbers ruled out so far
+
+        Returns:
+            bool: False if the board has reached a dead end, True otherwise
         """
-        pos = self.possible[row, col].copy()
-        for index, cell in enumerate(self.possible[row]):
-            if index != col:
-                pos -= cell
-            if not pos:
-                break
-        else:
-            num = pos.pop()
-            if self.row == row and self.col == col and self.num == num:
-                return False
-            self.board[row, col] = num
+        grid = self.grid
+        full_mask = grid.full_mask
+        rows, cols, boxes, banned = grid.rows, grid.cols, grid.boxes, grid.banned
+        box_of = grid.box_of
+        size = self.size
+        units = self.tables.units
+        # occupancy masks of the rows, columns and boxes with their units
+        groups = (
+            (rows, units[:size]),
+            (cols, units[size : 2 * size]),
+            (boxes, units[2 * size :]),
+        )
+        counts = self.stats.filled if self.collect_stats else None
+        changed = True
+        while changed:
+            changed = False
+            if counts is not None:
+                self.stats.preprocess_passes += 1
+            # candidates of the cells still empty, computed once per pass.
+            # Cells filled in later in the pass only make them supersets of
+            # the real candidates, which are checked before every fill
+            masks = {}
+            for row, col in list(self.empty):
+                pos = full_mask & ~(
+                    rows[row] | cols[col] | boxes[box_of[row][col]] | banned[row][col]
+                )
+                if not pos:
+                    return False
+                if not pos & (pos - 1):
+                    self.assign(row, col, pos.bit_length(), trail)
+                    if counts is not None:
+                        counts["naked_single"] += 1
+                    changed = True
+                else:
+                    masks[row, col] = pos
+
+            for occupied, group_units in groups:
+                for index, unit in enumerate(group_units):
+                    once = 0
+                    twice = 0
+                    for cell in unit:
+                        pos = masks.get(cell)
+                        if pos is not None:
+                            twice |= once & pos
+                            once |= pos
+                    filled = occupied[index]
+                    if once | filled != full_mask:
+                        return False
+                    hidden = once & ~twice & ~filled
+                    while hidden:
+                        bit = hidden & -hidden
+                        hidden ^= bit
+                        for cell in unit:
+                            pos = masks.get(cell)
+                            if pos is not None and pos & bit:
+                                break
+                        else:
+                            return False
+                        if not grid.candidates(*cell) & bit:
+                            return False
+                        self.assign(cell[0], cell[1], bit.bit_length(), trail)
+                        del masks[cell]
+                        if counts is not None:
+                            counts["hidden_single"] += 1
+                        changed = True
+
         return True
 
-    def fill_col(self, row, col):
-        """If specified cell has unique number that no other cells in
-        this column have, then fill it in
+    def deduce(self):
+        """Fills in as much of the board as singles and the enabled
+        techniques allow, without guessing. self.stats then tells which
+        rules the board needed
+
+        Returns:
+            bool: True if the board was completed, False otherwise
+        """
+        self.collect_stats = True
+        if any(self.grid.dups):
+            return False
+        self.empty = {
+            (i, j)
+            for i, row in enumerate(self.board.tolist())
+            for j, cell in enumerate(row)
+            if cell == 0
+        }
+        return self.propagate([]) and not self.empty
+
+    def select_cell(self):
+        """Finds the empty cell with the fewest possible numbers
+
+        Returns:
+            (int, int): row and col of the cell, None if the board is full
+        """
+        grid = self.grid
+        best = None
+        best_count = self.size + 1
+        for row, col in self.empty:
+            count = bit_count(grid.candidates(row, col))
+            if count < best_count:
+                best = (row, col)
+                best_count = count
+                if count <= 2:
+                    break
+        return best
+
+    def guess_order(self, row, col):
+        """Gets the numbers to guess for specified cell, in the order
+        search_mrv tries them
 
         Args:
             row (int): row of specified cell
             col (int): col of specified cell
+
+        Returns:
+            list of int: possible numbers of the cell, in increasing order
         """
-        pos = self.possible[row, col].copy()
-        for index, cell in enumerate(self.possible[:, col]):
-            if index != row:
-                pos -= cell
-            if not pos:
-                break
-        else:
-            num = pos.pop()
-            if self.row == row and self.col == col and self.num == num:
-                return False
-            self.board[row, col] = num
-        return True
+        return mask_to_nums(self.grid.candidates(row, col))
 
-    def fill_box(self, row, col):
-        """If specified cell has unique number that no other cells in
-        this box have, then fill it in
+    def search_mrv(self, limit=1):
+        """Guesses the most constrained cell first, filling in forced
+        cells after every guess. The board is left solved when the search
+        stops at the limit
 
         Args:
-            row (int): row of specified cell
-            col (int): col of specified cell
+            limit (int): number of solutions after which to stop
+
+        Raises:
+            BudgetExceeded: if the budget runs out before the search ends,
+                the board is then back to how it was before the search
+
+        Returns:
+            int: number of solutions found, at most limit
         """
-        r_beg = row // 3 * 3
-        c_beg = col // 3 * 3
-        pos = self.possible[row, col].copy()
-        flattened = self.possible[r_beg : r_beg + 3, c_beg : c_beg + 3].flatten()
-        for index, cell in enumerate(flattened):
-            if index != (row % 3) * 3 + (col % 3):
-                pos -= cell
-            if not pos:
-                break
+        return run_steps(self.search_mrv_steps(limit))
+
+    def search_mrv_steps(self, limit=1, step_size=STEP_SIZE):
+        """Step generator version of search_mrv. The board is also put
+        back if the generator is closed before the search ends
+
+        Args:
+            limit (int): number of solutions after which to stop
+            step_size (int): guesses between two yields
+
+        Raises:
+            BudgetExceeded: if the budget runs out before the search ends,
+                the board is then back to how it was before the search
+
+        Yields:
+            int: guesses made so far, after every step_size guesses
+
+        Returns:
+            int: number of solutions found, at most limit
+        """
+        if any(self.grid.dups):
+            return 0
+
+        self.empty = {
+            (i, j)
+            for i, row in enumerate(self.board.tolist())
+            for j, cell in enumerate(row)
+            if cell == 0
+        }
+        start = time.perf_counter()
+        trail = []
+        alive = self.propagate(trail)
+        self.stats.preprocess_time += time.perf_counter() - start
+        if not alive:
+            return 0
+
+        try:
+            return (yield from self.backtrack_steps(trail, limit, step_size))
+        except (BudgetExceeded, GeneratorExit):
+            self.undo(trail, 0)
+            raise
+
+    def backtrack_steps(self, trail, limit, step_size=STEP_SIZE):
+        """Main loop of search_mrv, once the initial forced cells are
+        filled in, pausing every step_size guesses
+
+        Args:
+            trail (list): cells filled in and numbers ruled out so far
+            limit (int): number of solutions after which to stop
+            step_size (int): guesses between two yields
+
+        Yields:
+            int: guesses made so far, after every step_size guesses
+
+        Returns:
+            int: number of solutions found, at most limit
+        """
+        stats = self.stats if self.collect_stats else None
+        solutions = 0
+        # every frame is [row, col, numbers left to guess, trail length]
+        stack = []
+        while True:
+            cell = self.select_cell()
+            if cell is None:
+                solutions += 1
+                if solutions >= limit:
+                    return solutions
+            else:
+                row, col = cell
+                stack.append([row, col, iter(self.guess_order(row, col)), len(trail)])
+                if stats is not None:
+                    stats.max_depth = max(stats.max_depth, len(stack))
+
+            while True:
+                if not stack:
+                    return solutions
+                row, col, nums, mark = stack[-1]
+                self.undo(trail, mark)
+                num = next(nums, None)
+                if num is None:
+                    stack.pop()
+                    if stats is not None:
+                        stats.backtracks += 1
+                    continue
+                self.budget.spend()
+                self.assign(row, col, num, trail)
+                alive = self.propagate(trail)
+                if self.budget.guesses % step_size == 0:
+                    yield self.budget.guesses
+                if alive:
+                    break
+
+    def count_solutions(self, limit=2, time_limit=None, max_guesses=None, cancel=None):
+        """Counts the solutions of the board, stopping early at limit
+
+        Args:
+            limit (int): number of solutions after which to stop
+            time_limit (float): seconds the count may take, None for no limit
+            max_guesses (int): guesses the count may make, None for no limit
+            cancel (threading.Event): stops the count once set
+
+        Raises:
+            BudgetExceeded: if the count runs out of budget or is cancelled
+
+        Returns:
+            int: number of solutions found, at most limit
+        """
+        self.budget = Budget(time_limit, max_guesses, cancel)
+        return self.search_mrv(limit)
+
+    def solve(self, time_limit=None, max_guesses=None, cancel=None):
+        """Solves the Sudoku board with backtracking. If the solve runs out
+        of budget or is cancelled, the guesses are taken back off the board
+
+        Args:
+            time_limit (float): seconds the solve may take, None for no limit
+            max_guesses (int): guesses the solve may make, None for no limit
+            cancel (threading.Event): stops the solve once set, e.g. from
+                another thread
+
+        Returns:
+            SolveStats: statistics of the solve, truthy if the board is
+                solved. Its status tells apart SOLVED, NO_SOLUTION and
+                BUDGET_EXCEEDED
+        """
+        stats = run_steps(self.solve_steps(time_limit, max_guesses, cancel))
+
+        if stats.status == SOLVED:
+            print("VALID")
+        elif stats.status == NO_SOLUTION:
+            print("NO SOLUTION")
         else:
-            num = pos.pop()
-            if self.row == row and self.col == col and self.num == num:
-                return False
-            self.board[row, col] = num
-        return True
+            print("BUDGET EXCEEDED")
+        return stats
+
+    def solve_steps(
+        self, time_limit=None, max_guesses=None, cancel=None, step_size=STEP_SIZE
+    ):
+        """Solves the Sudoku board like solve, as a generator pausing after
+        every step_size guesses, so that the caller can do other work in
+        between, e.g. a GUI handling its events. The guesses are taken
+        back off the board if the generator is closed before the end
+
+        Args:
+            time_limit (float): seconds the solve may take, None for no limit
+            max_guesses (int): guesses the solve may make, None for no limit
+            cancel (threading.Event): stops the solve once set
+            step_size (int): guesses between two yields
+
+        Yields:
+            int: guesses made so far, after every step_size guesses
+
+        Returns:
+            SolveStats: statistics of the solve, as in solve
+        """
+        stats = self.stats
+        start = time.perf_counter()
+        self.budget = Budget(time_limit, max_guesses, cancel)
+        try:
+            if self.search == "ordered":
+                self.preprocess()
+                stats.preprocess_time = time.perf_counter() - start
+                solved = yield from self.search_ordered_steps(step_size)
+            else:
+                solved = (yield from self.search_mrv_steps(1, step_size)) > 0
+            stats.status = SOLVED if solved else NO_SOLUTION
+        except BudgetExceeded:
+            self.clear_guesses()
+            stats.status = BUDGET_EXCEEDED
+        except GeneratorExit:
+            self.clear_guesses()
+            raise
+        stats.search_time = time.perf_counter() - start - stats.preprocess_time
+        stats.guesses = self.budget.guesses
+        return stats
+
+    def clear_guesses(self):
+        """Empties the cells guessed by search_ordered_steps
+        """
+        for row, col in self.zeros:
+            if self.board[row, col] != 0:
+                self.unplace(row, col)
+
+
+@profiled("random_solver", "solve")
+class SudokuRandomSolver(SudokuSolver):
+    """Given a Sudoku board, solves it using backtracking algorithm
+    """
+
+    def __init__(
+        self, board, row=None, col=None, num=None, search="ordered", seed=None
+    ):
+        super().__init__(board, search)
+        # own generator, so that equal seeds give equal boards and the
+        # global random module is left alone. None seeds from the OS
+        self.rng = random.Random(seed)
+        # shuffled numbers of every cell, drawn on first guess
+        self.orders = {}
+        # optional exclusion num
+        self.row = row
+        self.col = col
+        self.num = num
+        if num is not None:
+            self.grid.ban(row, col, num)
 
     def preprocess(self):
         """Fills in some cells of the Sudoku board that can be filled in
+
+        Returns:
+            bool: False if the board is found to have no solution
         """
         while not self.same:
-            self.possible = np.empty((9, 9), dtype=set)
-            self.get_zeros()
+            if not self.get_zeros():
+                return False
+            if self.collect_stats:
+                self.stats.preprocess_passes += 1
 
-            for i in range(9):
-                for j in range(9):
-                    if not self.check_self(i, j):
-                        return False
-                    if not self.fill_row(i, j):
-                        return False
-                    if not self.fill_col(i, j):
-                        return False
-                    if not self.fill_box(i, j):
-                        return False
+            for i in range(self.size):
+                for j in range(self.size):
+                    self.check_self(i, j)
+                    self.fill_row(i, j)
+                    self.fill_col(i, j)
+                    self.fill_box(i, j)
 
         # preprocessed
         return True
@@ -324,51 +767,407 @@ class SudokuRandomSolver(SudokuSolver):
             col (int): column of the cell to guess
         """
         cur_val = self.board[row, col]
-        random.seed(self.time_now + row * 9 + col)
-        num_list = self.NUM_LIST.copy()
-        random.shuffle(num_list)
-        if self.row == row and self.col == col:
-            num_list.remove(self.num)
+        num_list = self.cell_order(row, col)
         start = 0 if cur_val == 0 else num_list.index(cur_val) + 1
+        if cur_val != 0:
+            self.unplace(row, col)
         for num in num_list[start:]:
-            self.board[row, col] = num
+            self.place(row, col, num)
             if self.check_cell(row, col):
                 return True
-        self.board[row, col] = 0
+            self.unplace(row, col)
         return False
 
-    def solve(self):
+    def cell_order(self, row, col):
+        """Gets the random order in which to guess the numbers of a cell
+
+        Args:
+            row (int): row of the cell
+            col (int): column of the cell
+
+        Returns:
+            list of int: every number of the board but the exclusion num,
+                shuffled the same way every time the cell is guessed
+        """
+        num_list = self.orders.get((row, col))
+        if num_list is None:
+            num_list = self.tables.nums.copy()
+            self.rng.shuffle(num_list)
+            if self.row == row and self.col == col:
+                num_list.remove(self.num)
+            self.orders[row, col] = num_list
+        return num_list
+
+    def guess_order(self, row, col):
+        """Gets the numbers to guess for specified cell, in random order
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+
+        Returns:
+            list of int: possible numbers of the cell
+        """
+        pos = self.grid.candidates(row, col)
+        return [num for num in self.cell_order(row, col) if pos >> (num - 1) & 1]
+
+    def solve(self, time_limit=None, max_guesses=None, cancel=None):
         """Solves the Sudoku board with backtracking
+
+        Args:
+            time_limit (float): seconds the solve may take, None for no limit
+            max_guesses (int): guesses the solve may make, None for no limit
+            cancel (threading.Event): stops the solve once set
+
+        Returns:
+            SolveStats: statistics of the solve, truthy if the board is
+                solved
         """
-        if not self.preprocess():
-            # print("NO SOLUTION")
-            return False
+        return run_steps(self.solve_steps(time_limit, max_guesses, cancel))
 
-        for i, row in enumerate(self.board):
-            for j, cell in enumerate(row):
-                if cell == 0:
-                    self.zeros.append((i, j))
+    def solve_steps(
+        self, time_limit=None, max_guesses=None, cancel=None, step_size=STEP_SIZE
+    ):
+        """Solves the Sudoku board like solve, as a generator pausing after
+        every step_size guesses
 
-        while self.zero_index < len(self.zeros):
-            pos = self.zeros[self.zero_index]
-            if self.zero_index < 0:
-                # print("NO SOLUTION")
-                return False
-            if self.guess_cell(pos[0], pos[1]):
-                self.zero_index += 1
+        Args:
+            time_limit (float): seconds the solve may take, None for no limit
+            max_guesses (int): guesses the solve may make, None for no limit
+            cancel (threading.Event): stops the solve once set
+            step_size (int): guesses between two yields
+
+        Yields:
+            int: guesses made so far, after every step_size guesses
+
+        Returns:
+            SolveStats: statistics of the solve, as in solve
+        """
+        stats = self.stats
+        start = time.perf_counter()
+        self.budget = Budget(time_limit, max_guesses, cancel)
+        try:
+            if self.search == "ordered":
+                solved = self.preprocess()
+                stats.preprocess_time = time.perf_counter() - start
+                solved = solved and (yield from self.search_ordered_steps(step_size))
             else:
-                self.zero_index -= 1
+                solved = (yield from self.search_mrv_steps(1, step_size)) > 0
+            # final quality check of validity of solved board
+            solved = solved and not any(self.grid.dups)
+            stats.status = SOLVED if solved else NO_SOLUTION
+        except BudgetExceeded:
+            self.clear_guesses()
+            stats.status = BUDGET_EXCEEDED
+        except GeneratorExit:
+            self.clear_guesses()
+            raise
+        stats.search_time = time.perf_counter() - start - stats.preprocess_time
+        stats.guesses = self.budget.guesses
+        return stats
 
-        # final quality check of validity of solved board
-        for i in range(9):
-            for j in range(9):
-                if not self.check_cell(i, j):
-                    # print("NOT VALID")
-                    return False
 
-        # print("VALID")
+@profiled("dlx_solver", "solve", "count_solutions")
+class SudokuDLXSolver:
+    """Given a Sudoku board, solves it as an exact cover problem with
+    Dancing Links
+    """
+
+    # links of the exact cover matrix of an empty board by board size,
+    # built once per size
+    LINKS = {}
+
+    def __init__(self, board, row=None, col=None, num=None):
+        self.board = board
+        # optional exclusion num
+        self.row = row
+        self.col = col
+        self.num = num
+        # board size, the first option node comes after the column headers
+        self.board_size = board.shape[0]
+        self.headers = 1 + 4 * self.board_size ** 2
+        if self.board_size not in self.LINKS:
+            self.LINKS[self.board_size] = self.build_links(self.board_size)
+        links = self.LINKS[self.board_size]
+        self.left = links[0].copy()
+        self.right = links[1].copy()
+        self.up = links[2].copy()
+        self.down = links[3].copy()
+        self.column = links[4]
+        self.option = links[5]
+        self.size = links[6].copy()
+        self.solution = []
+        self.found = 0
+        self.budget = Budget()
+
+    @staticmethod
+    def build_links(board_size=9):
+        """Builds the exact cover matrix of an empty board. Node 0 is the
+        root, nodes 1 to 4 * n ** 2 are the column headers for the cell,
+        row, column and box constraints, followed by 4 nodes per option,
+        option (row * n + col) * n + num - 1 meaning num goes in (row, col)
+
+        Args:
+            board_size (int): number of rows n of the board
+
+        Returns:
+            tuple of lists: left, right, up, down, column and option of
+                every node, and the size of every column
+        """
+        tables = get_tables(board_size)
+        cells = board_size ** 2
+        headers = 1 + 4 * cells
+        total = headers + cells * board_size * 4
+        left = [0] * total
+        right = [0] * total
+        up = list(range(total))
+        down = list(range(total))
+        column = list(range(total))
+        option = [-1] * total
+        size = [0] * headers
+
+        for node in range(headers):
+            left[node] = node - 1 if node else headers - 1
+            right[node] = node + 1 if node < headers - 1 else 0
+
+        node = headers
+        for row in range(board_size):
+            for col in range(board_size):
+                box = tables.box_of[row][col]
+                for num in range(board_size):
+                    cols = (
+                        1 + row * board_size + col,
+                        1 + cells + row * board_size + num,
+                        1 + 2 * cells + col * board_size + num,
+                        1 + 3 * cells + box * board_size + num,
+                    )
+                    for index, header in enumerate(cols):
+                        cur = node + index
+                        left[cur] = node + (index - 1) % 4
+                        right[cur] = node + (index + 1) % 4
+                        column[cur] = header
+                        option[cur] = (row * board_size + col) * board_size + num
+                        # append node to the bottom of its column
+                        up[cur] = up[header]
+                        down[cur] = header
+                        down[up[header]] = cur
+                        up[header] = cur
+                        size[header] += 1
+                    node += 4
+
+        return left, right, up, down, column, option, size
+
+    def cover(self, col):
+        """Removes a column and every option that uses it from the matrix
+
+        Args:
+            col (int): header node of the column
+        """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col):
+        """Puts back a column removed by cover
+
+        Args:
+            col (int): header node of the column
+        """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def remove_option(self, node):
+        """Removes an option from the columns it belongs to
+
+        Args:
+            node (int): first node of the option
+        """
+        for cur in range(node, node + 4):
+            self.down[self.up[cur]] = self.down[cur]
+            self.up[self.down[cur]] = self.up[cur]
+            self.size[self.column[cur]] -= 1
+
+    def setup(self):
+        """Covers the columns satisfied by the numbers already on the board
+
+        Returns:
+            bool: False if the numbers on the board conflict, True otherwise
+        """
+        board_size = self.board_size
+        if self.num is not None and self.board[self.row, self.col] == 0:
+            option = (self.row * board_size + self.col) * board_size + self.num - 1
+            self.remove_option(self.headers + option * 4)
+
+        used = set()
+        for i, row in enumerate(self.board.tolist()):
+            for j, num in enumerate(row):
+                if num == 0:
+                    continue
+                node = self.headers + ((i * board_size + j) * board_size + num - 1) * 4
+                for cur in range(node, node + 4):
+                    col = self.column[cur]
+                    if col in used:
+                        return False
+                    used.add(col)
+                    self.cover(col)
         return True
 
+    def search(self, limit=1):
+        """Searches for exact covers of the remaining columns, always
+        branching on the column with the fewest options. self.solution
+        holds the last cover found when the search stops at the limit
+
+        Args:
+            limit (int): number of covers after which to stop
+
+        Raises:
+            BudgetExceeded: if the budget runs out before the search ends
+
+        Returns:
+            bool: True if limit covers were found, False otherwise
+        """
+        right, down, size = self.right, self.down, self.size
+        col = right[0]
+        if col == 0:
+            self.found += 1
+            return self.found >= limit
+
+        best = col
+        while col != 0:
+            if size[col] < size[best]:
+                best = col
+                if size[best] <= 1:
+                    break
+            col = right[col]
+        if size[best] == 0:
+            return False
+
+        self.cover(best)
+        node = down[best]
+        while node != best:
+            self.budget.spend()
+            self.solution.append(self.option[node])
+            cur = right[node]
+            while cur != node:
+                self.cover(self.column[cur])
+                cur = right[cur]
+
+            if self.search(limit):
+                return True
+
+            self.solution.pop()
+            cur = self.left[node]
+            while cur != node:
+                self.uncover(self.column[cur])
+                cur = self.left[cur]
+            node = down[node]
+        self.uncover(best)
+        return False
+
+    def solve(self, time_limit=None, max_guesses=None, cancel=None):
+        """Solves the Sudoku board with Dancing Links. The board is only
+        written to once a solution is found
+
+        Args:
+            time_limit (float): seconds the solve may take, None for no limit
+            max_guesses (int): options the solve may try, None for no limit
+            cancel (threading.Event): stops the solve once set
+
+        Returns:
+            SolveStats: statistics of the solve, truthy if the board is
+                solved
+        """
+        stats = SolveStats()
+        start = time.perf_counter()
+        self.budget = Budget(time_limit, max_guesses, cancel)
+        try:
+            solved = self.setup()
+            stats.preprocess_time = time.perf_counter() - start
+            solved = solved and self.search()
+            stats.status = SOLVED if solved else NO_SOLUTION
+        except BudgetExceeded:
+            stats.status = BUDGET_EXCEEDED
+        stats.search_time = time.perf_counter() - start - stats.preprocess_time
+        stats.guesses = self.budget.guesses
+
+        if stats.solved:
+            cells = get_tables(self.board_size).cells
+            for option in self.solution:
+                cell, num = divmod(option, self.board_size)
+                self.board[cells[cell]] = num + 1
+        return stats
+
+    def count_solutions(self, limit=2, time_limit=None, max_guesses=None, cancel=None):
+        """Counts the solutions of the board, stopping early at limit
+
+        Args:
+            limit (int): number of solutions after which to stop
+            time_limit (float): seconds the count may take, None for no limit
+            max_guesses (int): options the count may try, None for no limit
+            cancel (threading.Event): stops the count once set
+
+        Raises:
+            BudgetExceeded: if the count runs out of budget or is cancelled
+
+        Returns:
+            int: number of solutions found, at most limit
+        """
+        self.budget = Budget(time_limit, max_guesses, cancel)
+        if self.setup():
+            self.search(limit)
+        return self.found
+
+
+def count_solutions(
+    board,
+    limit=2,
+    solver_class=SudokuDLXSolver,
+    time_limit=None,
+    max_guesses=None,
+    cancel=None,
+):
+    """Counts the solutions of a board without modifying it, stopping
+    early at limit. count_solutions(board) == 1 means the board has a
+    unique solution
+
+    Args:
+        board (2D numpy array): board to count solutions of
+        limit (int): number of solutions after which to stop
+        solver_class (class): solver with a count_solutions method
+        time_limit (float): seconds the count may take, None for no limit
+        max_guesses (int): guesses the count may make, None for no limit
+        cancel (threading.Event): stops the count once set
+
+    Raises:
+        BudgetExceeded: if the count runs out of budget or is cancelled
+
+    Returns:
+        int: number of solutions found, at most limit
+    """
+    solver = solver_class(board.copy())
+    return solver.count_solutions(limit, time_limit, max_guesses, cancel)
+
 
 if __name__ == "__main__":
     # 2D list to represent the board, with value 0 representing empty cells
@@ -0,0 +1,107 @@
+"""This module contains SolveStats and Budget classes.
+SolveStats objects hold the outcome, counters and phase timings of one
+solve, and are returned by the solvers' solve methods.
+
+Budget objects limit the time and guesses a solve may spend, and let
+another thread cancel it.
+"""
+import time
+
+# possible outcomes of a solve
+SOLVED = "solved"
+NO_SOLUTION = "no_solution"
+BUDGET_EXCEEDED = "budget_exceeded"
+
+
+class BudgetExceeded(Exception):
+    """Raised when a solve runs out of time or guesses, or is cancelled
+    """
+
+
+class Budget:
+    """Limits on the work a single solve may do
+    """
+
+    def __init__(self, time_limit=None, max_guesses=None, cancel=None):
+        # time_limit is in seconds from now, None for no limit
+        self.deadline = None
+        if time_limit is not None:
+            self.deadline = time.perf_counter() + time_limit
+        self.max_guesses = max_guesses
+        # any object with an is_set method, e.g. threading.Event
+        self.cancel = cancel
+        self.guesses = 0
+
+    def spend(self):
+        """Counts one guess
+
+        Raises:
+            BudgetExceeded: if the budget is used up or was cancelled
+        """
+        self.guesses += 1
+        if self.max_guesses is not None and self.guesses > self.max_guesses:
+            raise BudgetExceeded("guess limit reached")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise BudgetExceeded("time limit reached")
+        if self.cancel is not None and self.cancel.is_set():
+            raise BudgetExceeded("cancelled")
+
+
+class SolveStats:
+    """Statistics of one solve, truthy when the board was solved
+    """
+
+    def __init__(self):
+        # SOLVED, NO_SOLUTION or BUDGET_EXCEEDED once the solve is over
+        self.status = None
+        # sweeps of the single rules over the board
+        self.preprocess_passes = 0
+        # cells filled in by every rule
+        self.filled = {"naked_single": 0, "hidden_single": 0}
+        # times every elimination technique made progress
+        self.techniques = {}
+        self.guesses = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        # wall time in seconds
+        self.preprocess_time = 0.0
+        self.search_time = 0.0
+
+    @property
+    def solved(self):
+        """Whether the board was solved
+        """
+        return self.status == SOLVED
+
+    @property
+    def total_time(self):
+        """Wall time of the whole solve in seconds
+        """
+        return self.preprocess_time + self.search_time
+
+    def as_dict(self):
+        """Converts the statistics into a JSON serializable dictionary
+
+        Returns:
+            dict: every statistic by name
+        """
+        return {
+            "status": self.status,
+            "solved": self.solved,
+            "preprocess_passes": self.preprocess_passes,
+            "filled": dict(self.filled),
+            "techniques": dict(self.techniques),
+            "guesses": self.guesses,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "preprocess_time": self.preprocess_time,
+            "search_time": self.search_time,
+            "total_time": self.total_time,
+        }
+
+    def __bool__(self):
+        return self.solved
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.as_dict().items())
+        return f"SolveStats({fields})"
@@ -0,0 +1,171 @@
+"""This module contains a generator based solve pipeline.
+Puzzles are read lazily, solved and yielded one at a time, so memory
+use stays flat however large the input is. Parallel solving keeps only
+a bounded number of chunks in flight. Every process may keep a cache of
+solutions by canonical form, so isomorphic copies of a puzzle are only
+solved once. Malformed lines are reported on stderr and passed through
+unsolved, so one bad line never stops a run.
+"""
+import random
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from sudoku.utils.sudoku_canonical import SolutionCache
+from sudoku.utils.sudoku_io import format_board, parse_board, read_numbered_lines
+from sudoku.utils.sudoku_solver import SudokuDLXSolver
+
+# solution cache of this process, set up by init_cache
+CACHE = None
+
+
+def init_cache(size):
+    """Sets up the solution cache used by solve_line in this process, run
+    by every worker process when it starts
+
+    Args:
+        size (int): number of canonical forms to keep, 0 for no cache
+
+    Returns:
+        SolutionCache: the cache, None if size is 0
+    """
+    global CACHE
+    CACHE = SolutionCache(size) if size else None
+    return CACHE
+
+
+def solve_line(line, number=None):
+    """Solves a single puzzle line. A line that is not a puzzle is
+    reported on stderr and returned as it is, unsolved
+
+    Args:
+        line (str): puzzle, 0 or . for empty cells
+        number (int): line number of the puzzle in its file, for reports
+
+    Returns:
+        (str, bool, float): solution line (the puzzle itself if it has no
+            solution), whether it was solved, and seconds taken
+    """
+    start = time.perf_counter()
+    try:
+        board = parse_board(line)
+    except ValueError as error:
+        print(f"line {number}: {error}", file=sys.stderr)
+        return line, False, time.perf_counter() - start
+    if CACHE is not None:
+        solved = CACHE.solve(board)
+    else:
+        solved = SudokuDLXSolver(board).solve().solved
+    return format_board(board), solved, time.perf_counter() - start
+
+
+def solve_chunk(lines):
+    """Solves a chunk of puzzle lines, run by the worker processes
+
+    Args:
+        lines (list of (int, str)): line numbers and puzzles to solve
+
+    Returns:
+        list of (str, bool, float): solve_line result of every puzzle
+    """
+    return [solve_line(line, number) for number, line in lines]
+
+
+def chunked(lines, size):
+    """Groups lines into lists of at most size lines
+
+    Args:
+        lines (iterable): lines to group, e.g. numbered puzzle lines
+        size (int): maximum number of lines per chunk
+
+    Yields:
+        list: next chunk of lines
+    """
+    lines = iter(lines)
+    chunk = list(islice(lines, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(lines, size))
+
+
+def solve_stream(file):
+    """Solves the puzzles of a file one at a time
+
+    Args:
+        file (file object): file to read puzzles from, e.g. sys.stdin
+
+    Yields:
+        (str, bool, float): solve_line result of every puzzle, in order
+    """
+    for number, line in read_numbered_lines(file):
+        yield solve_line(line, number)
+
+
+def solve_stream_parallel(file, executor, workers, chunk_size=256):
+    """Solves the puzzles of a file on a process pool, keeping at most
+    two chunks per worker in flight
+
+    Args:
+        file (file object): file to read puzzles from, e.g. sys.stdin
+        executor (concurrent.futures.Executor): pool to solve chunks on
+        workers (int): number of workers of executor
+        chunk_size (int): puzzles per task
+
+    Yields:
+        (str, bool, float): solve_line result of every puzzle, in order
+    """
+    pending = deque()
+    for chunk in chunked(read_numbered_lines(file), chunk_size):
+        pending.append(executor.submit(solve_chunk, chunk))
+        if len(pending) >= 2 * workers:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+class LatencyStats:
+    """Keeps track of solve latencies in constant memory, percentiles
+    are estimated from a fixed size random sample
+    """
+
+    def __init__(self, sample_size=100000, seed=0):
+        self.sample_size = sample_size
+        self.sample = []
+        self.count = 0
+        self.failed = 0
+        self.max = 0.0
+        self.rng = random.Random(seed)
+
+    def add(self, seconds, solved=True):
+        """Records the latency of one puzzle
+
+        Args:
+            seconds (float): time taken to solve the puzzle
+            solved (bool): whether the puzzle was solved
+        """
+        self.count += 1
+        self.failed += not solved
+        self.max = max(self.max, seconds)
+        if len(self.sample) < self.sample_size:
+            self.sample.append(seconds)
+        else:
+            # reservoir sampling keeps every latency equally likely
+            index = self.rng.randrange(self.count)
+            if index < self.sample_size:
+                self.sample[index] = seconds
+
+    def percentiles(self, points):
+        """Estimates latency percentiles
+
+        Args:
+            points (list of float): percentiles to compute, from 0 to 100
+
+        Returns:
+            numpy array: latency in seconds at every percentile
+        """
+        if not self.sample:
+            return np.zeros(len(points))
+        return np.percentile(self.sample, points)
@@ -0,0 +1,131 @@
+"""This module contains the index tables of Sudoku boards.
+A board of size n is split into n rows, n columns and n boxes of
+box_size x box_size cells, where n == box_size ** 2, and holds the
+numbers 1 to n. The tables of every size are built once and shared by
+all the boards of that size.
+
+Cells are referred to either as (row, col) tuples or as flat indices
+row * n + col into board.ravel(). Every table comes as Python tuples
+for per cell loops and as NumPy index arrays for whole board lookups.
+The tables of the 9x9 board are also available as module constants.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+class BoardTables:
+    """Units, peers and masks of a board of a given size
+    """
+
+    def __init__(self, size):
+        box_size = int(round(size ** 0.5))
+        if size < 1 or box_size * box_size != size:
+            raise ValueError(f"board size must be a square number, got {size}")
+        self.size = size
+        self.box_size = box_size
+        # mask with the bits of every number set, bit num - 1 for num
+        self.full_mask = (1 << size) - 1
+        self.nums = list(range(1, size + 1))
+        # bits[num] is the mask of num, bits[0] is the empty mask
+        self.bits = [0] + [1 << (num - 1) for num in self.nums]
+        # box_of[row][col] is the box of the cell
+        self.box_of = [
+            [row // box_size * box_size + col // box_size for col in range(size)]
+            for row in range(size)
+        ]
+        # cells of the units as (row, col) tuples, units 0 to size - 1 are
+        # rows, then come the columns and then the boxes
+        self.units = (
+            [[(row, col) for col in range(size)] for row in range(size)]
+            + [[(row, col) for row in range(size)] for col in range(size)]
+            + [
+                [
+                    (
+                        box // box_size * box_size + i // box_size,
+                        box % box_size * box_size + i % box_size,
+                    )
+                    for i in range(size)
+                ]
+                for box in range(size)
+            ]
+        )
+        # peers[row][col] are the other cells sharing a unit with the cell
+        self.peers = [
+            [
+                tuple(
+                    sorted(
+                        (
+                            set(self.units[row])
+                            | set(self.units[size + col])
+                            | set(self.units[2 * size + self.box_of[row][col]])
+                        )
+                        - {(row, col)}
+                    )
+                )
+                for col in range(size)
+            ]
+            for row in range(size)
+        ]
+        # cell_units[row][col] are the row, column and box unit of the cell
+        self.cell_units = [
+            [(row, size + col, 2 * size + self.box_of[row][col]) for col in range(size)]
+            for row in range(size)
+        ]
+        # cells[flat] is the (row, col) of a flat index, flat[row][col] the
+        # flat index of a cell
+        self.cells = [divmod(flat, size) for flat in range(size * size)]
+        self.flat = [[row * size + col for col in range(size)] for row in range(size)]
+
+        # the same tables as NumPy arrays of flat indices, e.g.
+        # board.take(unit_index) gives the numbers of every unit
+        self.flat_index = np.arange(size * size).reshape(size, size)
+        self.cell_rows, self.cell_cols = np.divmod(np.arange(size * size), size)
+        self.unit_index = np.array(
+            [[row * size + col for row, col in unit] for unit in self.units]
+        )
+        self.peer_index = np.array(
+            [[row * size + col for row, col in self.peers[i][j]] for i, j in self.cells]
+        )
+        self.cell_unit_index = np.array(
+            [self.cell_units[row][col] for row, col in self.cells]
+        )
+
+
+@lru_cache(maxsize=None)
+def get_tables(size=9):
+    """Gets the tables of a board size, building them on first use
+
+    Args:
+        size (int): number of rows of the board, a square number
+
+    Raises:
+        ValueError: if size is not a square number
+
+    Returns:
+        BoardTables: tables of the size
+    """
+    return BoardTables(size)
+
+
+def bit_count(mask):
+    """Counts the numbers in a mask
+
+    Args:
+        mask (int): mask of numbers
+
+    Returns:
+        int: number of set bits in mask
+    """
+    return bin(mask).count("1")
+
+
+TABLES = get_tables(9)
+# cells of the 27 units of the 9x9 board, rows, columns and then boxes
+UNITS = TABLES.units
+# PEERS[row][col] are the 20 cells sharing a unit with the cell
+PEERS = TABLES.peers
+CELL_UNITS = TABLES.cell_units
+CELLS = TABLES.cells
+UNIT_INDEX = TABLES.unit_index
+PEER_INDEX = TABLES.peer_index
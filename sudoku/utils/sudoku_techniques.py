@@ -0,0 +1,207 @@
+"""This module contains the elimination techniques used by SudokuSolver
+on top of naked and hidden singles. Every technique takes the candidate
+grid of a board, the set of its empty cells and the trail to record
+eliminations in, and returns whether it ruled out any candidate.
+
+TECHNIQUES maps the name of every technique to its function, in the
+order they are tried.
+"""
+from sudoku.utils.sudoku_tables import bit_count
+
+
+def empty_cells(grid, empty, unit):
+    """Gets the empty cells of a unit with their candidates
+
+    Args:
+        grid (CandidateGrid): candidates of the board
+        empty (set): empty cells of the board
+        unit (list of tuples): cells of the unit
+
+    Returns:
+        list of ((int, int), int): every empty cell with its mask
+    """
+    return [(cell, grid.candidates(*cell)) for cell in unit if cell in empty]
+
+
+def naked_pairs(grid, empty, trail):
+    """If two cells of a unit have the same two candidates, rules those
+    numbers out for the other cells of the unit
+
+    Args:
+        grid (CandidateGrid): candidates of the board
+        empty (set): empty cells of the board
+        trail (list): where to record eliminations
+
+    Returns:
+        bool: True if any candidate was ruled out
+    """
+    changed = False
+    for unit in grid.tables.units:
+        cells = empty_cells(grid, empty, unit)
+        seen = {}
+        for cell, mask in cells:
+            if bit_count(mask) != 2:
+                continue
+            if mask not in seen:
+                seen[mask] = cell
+                continue
+            pair = (seen[mask], cell)
+            for other, other_mask in cells:
+                if other not in pair and other_mask & mask:
+                    changed |= grid.eliminate(*other, mask, trail)
+    return changed
+
+
+def hidden_pairs(grid, empty, trail):
+    """If two numbers can only go in the same two cells of a unit, rules
+    out every other number for those cells
+
+    Args:
+        grid (CandidateGrid): candidates of the board
+        empty (set): empty cells of the board
+        trail (list): where to record eliminations
+
+    Returns:
+        bool: True if any candidate was ruled out
+    """
+    changed = False
+    nums = grid.tables.nums
+    for unit in grid.tables.units:
+        cells = empty_cells(grid, empty, unit)
+        # where[num] has bit index set when cells[index] can hold num
+        where = [0] * (grid.size + 1)
+        for index, (_, mask) in enumerate(cells):
+            for num in nums:
+                if mask >> (num - 1) & 1:
+                    where[num] |= 1 << index
+        seen = {}
+        for num in nums:
+            if bit_count(where[num]) != 2:
+                continue
+            if where[num] not in seen:
+                seen[where[num]] = num
+                continue
+            keep = 1 << (num - 1) | 1 << (seen[where[num]] - 1)
+            for index, (cell, mask) in enumerate(cells):
+                if where[num] & (1 << index) and mask & ~keep:
+                    changed |= grid.eliminate(*cell, mask & ~keep, trail)
+    return changed
+
+
+def pointing_pairs(grid, empty, trail):
+    """If a number can only go in one row or column of a box, rules it
+    out for the rest of that row or column
+
+    Args:
+        grid (CandidateGrid): candidates of the board
+        empty (set): empty cells of the board
+        trail (list): where to record eliminations
+
+    Returns:
+        bool: True if any candidate was ruled out
+    """
+    changed = False
+    size = grid.size
+    units = grid.tables.units
+    box_of = grid.tables.box_of
+    for box, unit in enumerate(units[2 * size :]):
+        cells = empty_cells(grid, empty, unit)
+        for num in grid.tables.nums:
+            bit = 1 << (num - 1)
+            rows = {cell[0] for cell, mask in cells if mask & bit}
+            cols = {cell[1] for cell, mask in cells if mask & bit}
+            if len(rows) == 1:
+                line = units[rows.pop()]
+            elif len(cols) == 1:
+                line = units[size + cols.pop()]
+            else:
+                continue
+            for (row, col), mask in empty_cells(grid, empty, line):
+                if box_of[row][col] != box and mask & bit:
+                    changed |= grid.eliminate(row, col, bit, trail)
+    return changed
+
+
+def box_line_reduction(grid, empty, trail):
+    """If a number can only go in one box of a row or column, rules it
+    out for the rest of that box
+
+    Args:
+        grid (CandidateGrid): candidates of the board
+        empty (set): empty cells of the board
+        trail (list): where to record eliminations
+
+    Returns:
+        bool: True if any candidate was ruled out
+    """
+    changed = False
+    size = grid.size
+    units = grid.tables.units
+    box_of = grid.tables.box_of
+    for line in units[: 2 * size]:
+        cells = empty_cells(grid, empty, line)
+        line_cells = set(line)
+        for num in grid.tables.nums:
+            bit = 1 << (num - 1)
+            boxes = {box_of[row][col] for (row, col), mask in cells if mask & bit}
+            if len(boxes) != 1:
+                continue
+            for cell, mask in empty_cells(grid, empty, units[2 * size + boxes.pop()]):
+                if cell not in line_cells and mask & bit:
+                    changed |= grid.eliminate(*cell, bit, trail)
+    return changed
+
+
+def x_wing(grid, empty, trail):
+    """If a number can only go in the same two columns of two rows, rules
+    it out for the rest of those columns, and the same with rows and
+    columns swapped
+
+    Args:
+        grid (CandidateGrid): candidates of the board
+        empty (set): empty cells of the board
+        trail (list): where to record eliminations
+
+    Returns:
+        bool: True if any candidate was ruled out
+    """
+    changed = False
+    size = grid.size
+    rows = grid.tables.units[:size]
+    cols = grid.tables.units[size : 2 * size]
+    for num in grid.tables.nums:
+        bit = 1 << (num - 1)
+        for lines, across in ((rows, cols), (cols, rows)):
+            seen = {}
+            for index, line in enumerate(lines):
+                # positions has bit pos set when cell pos of line can hold num
+                positions = 0
+                for pos, cell in enumerate(line):
+                    if cell in empty and grid.candidates(*cell) & bit:
+                        positions |= 1 << pos
+                if bit_count(positions) != 2:
+                    continue
+                if positions not in seen:
+                    seen[positions] = index
+                    continue
+                wing = (seen[positions], index)
+                for pos in range(size):
+                    if not positions & (1 << pos):
+                        continue
+                    for other, cell in enumerate(across[pos]):
+                        if (
+                            other not in wing
+                            and cell in empty
+                            and grid.candidates(*cell) & bit
+                        ):
+                            changed |= grid.eliminate(*cell, bit, trail)
+    return changed
+
+
+TECHNIQUES = {
+    "naked_pairs": naked_pairs,
+    "hidden_pairs": hidden_pairs,
+    "pointing_pairs": pointing_pairs,
+    "box_line_reduction": box_line_reduction,
+    "x_wing": x_wing,
+}
@@ -0,0 +1,159 @@
+"""This module contains SolveTrace, TracingSolver and TraceReplay classes.
+TracingSolver is a SudokuSolver that records every number it fills in
+or takes back into a SolveTrace, two compact arrays with one entry per
+step. A solve can then run at full speed and be watched afterwards, e.g.
+by SudokuVisualSolver at a chosen pace.
+
+TraceReplay applies the steps of a trace to a board and can seek to any
+step, forwards or backwards. Snapshots of the board taken every
+KEYFRAME_INTERVAL steps keep long backward seeks short.
+"""
+from array import array
+
+from sudoku.utils.sudoku_solver import SudokuSolver
+from sudoku.utils.sudoku_tables import get_tables
+
+# steps between the board snapshots kept by TraceReplay
+KEYFRAME_INTERVAL = 4096
+
+
+class SolveTrace:
+    """Numbers filled in and taken back during a solve, in order
+    """
+
+    def __init__(self, size=9):
+        self.size = size
+        # flat index of the cell of every step
+        self.cells = array("H")
+        # number filled in by every step, negated for a number taken back
+        self.nums = array("b")
+
+    def __len__(self):
+        return len(self.cells)
+
+    def place(self, flat, num):
+        """Records a number filled in
+
+        Args:
+            flat (int): flat index of the cell
+            num (int): number filled in
+        """
+        self.cells.append(flat)
+        self.nums.append(num)
+
+    def remove(self, flat, num):
+        """Records a number taken back
+
+        Args:
+            flat (int): flat index of the cell
+            num (int): number the cell held
+        """
+        self.cells.append(flat)
+        self.nums.append(-num)
+
+
+class TracingSolver(SudokuSolver):
+    """SudokuSolver recording its steps into self.trace
+    """
+
+    def __init__(self, board, search="mrv", techniques=()):
+        SudokuSolver.__init__(self, board, search, techniques, stats=False)
+        self.trace = SolveTrace(self.size)
+        self.flat = self.tables.flat
+
+    def place(self, row, col, num):
+        """Fills in specified cell with num and records it
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+            num (int): number to fill in
+        """
+        SudokuSolver.place(self, row, col, num)
+        self.trace.place(self.flat[row][col], int(num))
+
+    def unplace(self, row, col):
+        """Empties specified cell and records it
+
+        Args:
+            row (int): row of specified cell
+            col (int): col of specified cell
+        """
+        self.trace.remove(self.flat[row][col], int(self.board[row, col]))
+        SudokuSolver.unplace(self, row, col)
+
+
+class TraceReplay:
+    """Plays a trace back on the board it was recorded from
+    """
+
+    def __init__(self, trace, board, keyframe_interval=KEYFRAME_INTERVAL):
+        self.trace = trace
+        # board in the state the trace was recorded from, updated in place
+        self.board = board
+        self.cells = get_tables(trace.size).cells
+        # number of steps applied to the board so far
+        self.position = 0
+        self.keyframe_interval = keyframe_interval
+        # step to the board after it, for every multiple of the interval
+        # reached so far
+        self.keyframes = {0: board.copy()}
+
+    def __len__(self):
+        return len(self.trace)
+
+    @property
+    def done(self):
+        """bool: True once every step is applied
+        """
+        return self.position >= len(self.trace)
+
+    def forward(self):
+        """Applies the next step
+        """
+        num = self.trace.nums[self.position]
+        self.board[self.cells[self.trace.cells[self.position]]] = max(num, 0)
+        self.position += 1
+        if self.position % self.keyframe_interval == 0:
+            self.keyframes.setdefault(self.position, self.board.copy())
+
+    def backward(self):
+        """Undoes the last step applied
+        """
+        self.position -= 1
+        num = self.trace.nums[self.position]
+        self.board[self.cells[self.trace.cells[self.position]]] = max(-num, 0)
+
+    def seek(self, step):
+        """Brings the board to how it was after a given number of steps
+
+        Args:
+            step (int): number of steps, clamped to the length of the trace
+
+        Returns:
+            int: the step reached
+        """
+        step = min(max(step, 0), len(self.trace))
+        if self.position - step > self.keyframe_interval:
+            keyframe = step - step % self.keyframe_interval
+            while keyframe not in self.keyframes:
+                keyframe -= self.keyframe_interval
+            self.board[...] = self.keyframes[keyframe]
+            self.position = keyframe
+        while self.position < step:
+            self.forward()
+        while self.position > step:
+            self.backward()
+        return self.position
+
+    def advance(self, steps):
+        """Moves the board a number of steps forwards, or backwards for
+        negative steps
+
+        Args:
+            steps (int): number of steps to move by
+
+        Returns:
+            int: the step reached
+        """
+        return self.seek(self.position + steps)
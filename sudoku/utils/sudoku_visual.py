@@ -1,91 +1,102 @@
-"""This module contains SudokuGui class.
-SudokuGui objects contain a representation of the Sudoku
-puzzle game.
+"""This module contains SudokuVisualSolver class.
+SudokuVisualSolver solves a board at full speed while recording a trace
+of its steps, a time slice per frame so the window stays responsive,
+then replays the trace on the GUI at a chosen number of
+steps per second. The steps due within one frame are drawn together, so
+the replay speed does not depend on the frame rate.
+
+Replay controls:
+    UP / DOWN       double / halve the speed
+    LEFT / RIGHT    seek one second of steps backwards / forwards
+    RETURN / ESC    skip to the end of the solve
 """
 import sys
 
-import numpy as np
 import pygame
 
-from sudoku.utils.sudoku_gui import SudokuGui
-from sudoku.utils.sudoku_solver import SudokuSolver
+from sudoku.utils.sudoku_gui import SOLVE_SLICE, SOLVE_TIME_LIMIT, SudokuGui
+from sudoku.utils.sudoku_solver import run_slice
+from sudoku.utils.sudoku_trace import TraceReplay, TracingSolver
 
+# steps replayed per second when the replay starts
+REPLAY_SPEED = 60
+MAX_REPLAY_SPEED = 1 << 16
+FRAME_RATE = 60
 
-class SudokuVisualSolver(SudokuGui, SudokuSolver):
+
+class SudokuVisualSolver(SudokuGui):
     """Class representing a solver for a Sudoku board
     with a visualized solving process
     """
 
-    def __init__(self, board, display):
+    def __init__(self, board, display, search="mrv", speed=REPLAY_SPEED):
         SudokuGui.__init__(self, board)
-        SudokuSolver.__init__(self, board)
+        # the board being solved, shared with the caller
+        self.board = board
         self.display = display
+        # search of the recording solver, "mrv" or "ordered"
+        self.search = search
+        # steps replayed per second
+        self.speed = speed
+        self.replay = None
 
-    def preprocess(self):
-        """Fills in some cells of the Sudoku board that can be filled in
-        """
-        while not self.same:
-
-            for event in pygame.event.get():
-                # enable closing of display
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    pygame.quit()
-                    sys.exit()
-
-            self.possible = np.empty((9, 9), dtype=set)
-            self.get_zeros()
+    def record(self):
+        """Solves a copy of the board, recording the steps taken
 
-            for i in range(9):
-                for j in range(9):
-                    self.check_self(i, j)
-                    self.fill_row(i, j)
-                    self.fill_col(i, j)
-                    self.fill_box(i, j)
-                    self.update_gui()
-
-    def guess_cell(self, row, col):
-        """Guesses the value of a cell
-
-        Args:
-            row (int): row of the cell to guess
-            col (int): column of the cell to guess
+        Returns:
+            (SolveTrace, SolveStats): trace and statistics of the solve
         """
-        cur_val = self.board[row, col]
-        for num in range(cur_val + 1, 10):
+        solver = TracingSolver(self.board.copy(), search=self.search)
+        steps = solver.solve_steps(time_limit=SOLVE_TIME_LIMIT)
+        clock = pygame.time.Clock()
+        while True:
+            done, stats = run_slice(steps, SOLVE_SLICE)
+            if done:
+                return solver.trace, stats
+            self.check_replay_events()
+            clock.tick(FRAME_RATE)
             self.update_gui()
-            self.board[row, col] = num
-            if self.check_cell(row, col):
-                return True
-        self.board[row, col] = 0
-        return False
 
-    def solve(self):
-        """Solves the Sudoku board with backtracking
+    def check_replay_events(self):
+        """Handles the replay controls
         """
-        self.preprocess()
+        for event in pygame.event.get():
+            # enable closing of display
+            if event.type == pygame.QUIT:
+                self.running = False
+                pygame.quit()
+                sys.exit()
+            # only closing the display works until the replay starts
+            if event.type != pygame.KEYDOWN or self.replay is None:
+                continue
+            if event.key == pygame.K_UP:
+                self.speed = min(self.speed * 2, MAX_REPLAY_SPEED)
+            elif event.key == pygame.K_DOWN:
+                self.speed = max(self.speed // 2, 1)
+            elif event.key == pygame.K_RIGHT:
+                self.replay.advance(self.speed)
+            elif event.key == pygame.K_LEFT:
+                self.replay.advance(-self.speed)
+            elif event.key in (pygame.K_RETURN, pygame.K_ESCAPE):
+                self.replay.seek(len(self.replay))
 
-        for i, row in enumerate(self.board):
-            for j, cell in enumerate(row):
-                if cell == 0:
-                    self.zeros.append((i, j))
-
-        while self.zero_index < len(self.zeros):
-
-            for event in pygame.event.get():
-                # enable closing of display
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    pygame.quit()
-                    sys.exit()
-
-            pos = self.zeros[self.zero_index]
-            if self.zero_index < 0:
-                print("NO SOLUTION")
-                return False
-            if self.guess_cell(pos[0], pos[1]):
-                self.zero_index += 1
-            else:
-                self.zero_index -= 1
+    def solve(self):
+        """Solves the Sudoku board, then replays the solve on the GUI
 
-        print("VALID")
+        Returns:
+            SolveStats: statistics of the solve, truthy if the board is
+                solved
+        """
+        trace, stats = self.record()
+        self.replay = TraceReplay(trace, self.board)
+        clock = pygame.time.Clock()
+        # steps due but not shown yet, carried over between frames
+        due = 0.0
+        while not self.replay.done:
+            self.check_replay_events()
+            due += self.speed * clock.tick(FRAME_RATE) / 1000
+            steps = int(due)
+            due -= steps
+            self.replay.advance(steps)
+            self.update_gui()
+        return stats
@@ -0,0 +1,77 @@
+"""This module contains SolveWorker class.
+SolveWorker objects solve a copy of a board on a background thread, so
+that the GUI keeps drawing frames and handling events meanwhile. The
+progress of the solve can be read at any time, and the solve can be
+cancelled through the solver's budget.
+"""
+import threading
+import time
+
+from sudoku.utils.sudoku_solver import SudokuDLXSolver
+from sudoku.utils.sudoku_stats import NO_SOLUTION, SolveStats
+
+
+class SolveWorker:
+    """Solves a copy of a board on a daemon thread
+    """
+
+    def __init__(self, board, solver_class=SudokuDLXSolver, time_limit=None):
+        # copy of the board, only written to by the worker thread
+        self.board = board.copy()
+        self.solver = solver_class(self.board)
+        self.time_limit = time_limit
+        self.cancel_event = threading.Event()
+        # SolveStats of the solve once it is over
+        self.stats = None
+        self.start_time = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        """Starts solving on the worker thread
+
+        Returns:
+            SolveWorker: the worker itself
+        """
+        self.start_time = time.perf_counter()
+        self.thread.start()
+        return self
+
+    def run(self):
+        """Solves the board, run by the worker thread. stats is set even if
+        the solver raises, so that the solve always ends
+        """
+        stats = None
+        try:
+            stats = self.solver.solve(
+                time_limit=self.time_limit, cancel=self.cancel_event
+            )
+        finally:
+            if stats is None:
+                stats = SolveStats()
+                stats.status = NO_SOLUTION
+            self.stats = stats
+
+    def cancel(self):
+        """Asks the solve to stop at its next guess
+        """
+        self.cancel_event.set()
+
+    @property
+    def done(self):
+        """bool: True once the solve is over
+        """
+        return self.stats is not None
+
+    @property
+    def guesses(self):
+        """int: guesses made so far
+        """
+        return self.solver.budget.guesses
+
+    @property
+    def elapsed(self):
+        """float: seconds since the solve started
+        """
+        if self.start_time is None:
+            return 0.0
+        return time.perf_counter() - self.start_time